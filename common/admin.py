@@ -0,0 +1,99 @@
+from django.contrib.admin.options import TO_FIELD_VAR
+from django.contrib.admin.utils import unquote
+from django.contrib.auth import get_permission_codename, get_user_model
+from django.contrib.auth.admin import UserAdmin
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count
+from django.urls import path
+
+
+class BatchDeleteMixin:
+    """
+    Подтверждённое удаление объекта без общей транзакции.
+
+    ModelAdmin.delete_view оборачивает удаление в transaction.atomic,
+    и короткие транзакции пачек сливаются в одну долгую: запись
+    блокируется на всё удаление. Поэтому адрес удаления ведёт
+    в batch_delete_view: страницу подтверждения и все отказы он
+    оставляет delete_view, а подтверждённое удаление выполняет сам,
+    теми же log_deletion, delete_model и response_delete.
+    Удаление, упавшее на середине, оставляет уже удалённые пачки
+    удалёнными; повторное удаление доделает остальное.
+    """
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                '<path:object_id>/delete/',
+                self.admin_site.admin_view(self.batch_delete_view),
+                name=f'{opts.app_label}_{opts.model_name}_delete',
+            ),
+            *super().get_urls(),
+        ]
+
+    def batch_delete_view(self, request, object_id, extra_context=None):
+        # Как в delete_view: удаление подтверждает непустой POST.
+        if not request.POST or TO_FIELD_VAR in request.GET or (
+            TO_FIELD_VAR in request.POST
+        ):
+            return self.delete_view(request, object_id, extra_context)
+        obj = self.get_object(request, unquote(object_id))
+        if obj is None or not self.has_delete_permission(request, obj):
+            return self.delete_view(request, object_id, extra_context)
+        _, _, perms_needed, protected = self.get_deleted_objects(
+            [obj], request
+        )
+        if protected:
+            return self.delete_view(request, object_id, extra_context)
+        if perms_needed:
+            raise PermissionDenied
+        obj_display = str(obj)
+        obj_id = obj.serializable_value(self.model._meta.pk.attname)
+        self.log_deletion(request, obj, obj_display)
+        self.delete_model(request, obj)
+        return self.response_delete(request, obj_display, obj_id)
+
+
+class BatchDeleteUserAdmin(BatchDeleteMixin, UserAdmin):
+    """
+    Пользователи удаляются вместе с related_model пачками.
+
+    Подклассы задают related_model, count_label — как подписать число
+    связанных объектов — и delete_users: функцию, которая получает
+    queryset пользователей и удаляет их.
+    """
+    related_model = None
+    count_label = None
+    delete_users = None
+
+    def get_deleted_objects(self, objs, request):
+        """Вместо списка всех связанных объектов показываем их число."""
+        User = get_user_model()
+        opts = self.related_model._meta
+        users = User.objects.filter(
+            pk__in=[user.pk for user in objs]
+        ).annotate(related=Count(opts.model_name))
+        related = sum(user.related for user in users)
+        perms_needed = set()
+        codename = get_permission_codename('delete', opts)
+        if related and not request.user.has_perm(
+            f'{opts.app_label}.{codename}'
+        ):
+            perms_needed.add(opts.verbose_name)
+        to_delete = [
+            f'{User._meta.verbose_name}: {user} '
+            f'({self.count_label}: {user.related})'
+            for user in users
+        ]
+        model_count = {
+            User._meta.verbose_name_plural: len(users),
+            opts.verbose_name_plural: related,
+        }
+        return to_delete, model_count, perms_needed, []
+
+    def delete_model(self, request, obj):
+        self.delete_users(get_user_model().objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        self.delete_users(queryset)
@@ -0,0 +1,98 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import get_user_model
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.db.models.signals import post_delete, post_save
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+# Больше пользователей процесс не помнит: кеш просто очищается.
+MAX_CACHED_USERS = 10000
+
+_lock = threading.Lock()
+_users = {}
+
+
+def _remember(user):
+    """Запоминает поля пользователя, а не сам объект: он общий для потоков."""
+    values = {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields
+    }
+    expires = time.monotonic() + settings.AUTH_USER_CACHE_TIMEOUT
+    with _lock:
+        if len(_users) >= MAX_CACHED_USERS:
+            _users.clear()
+        _users[user.pk] = (expires, user._state.db, values)
+
+
+def _recall(pk):
+    with _lock:
+        cached = _users.get(pk)
+    if cached is None:
+        return None
+    expires, db, values = cached
+    if expires < time.monotonic():
+        forget_user(pk)
+        return None
+    User = get_user_model()
+    return User.from_db(db, list(values), list(values.values()))
+
+
+def forget_user(pk):
+    with _lock:
+        _users.pop(pk, None)
+
+
+def get_user(request):
+    """
+    Пользователь сессии из кеша процесса, а при промахе — из базы.
+
+    Закешированный пользователь проверяется по хешу пароля в сессии,
+    как это делает django.contrib.auth.get_user. Смена пароля в этом
+    процессе сбрасывает кеш сразу, в других — через таймаут.
+    """
+    session = request.session
+    try:
+        pk = get_user_model()._meta.pk.to_python(session[auth.SESSION_KEY])
+        backend = session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return auth.get_user(request)
+    user = _recall(pk)
+    if user is not None and backend in settings.AUTHENTICATION_BACKENDS:
+        session_hash = session.get(auth.HASH_SESSION_KEY)
+        if session_hash and constant_time_compare(
+            session_hash, user.get_session_auth_hash()
+        ):
+            return user
+        forget_user(pk)
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        _remember(user)
+    return user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    AuthenticationMiddleware, который не читает пользователя из базы
+    на каждый запрос, а держит его settings.AUTH_USER_CACHE_TIMEOUT
+    секунд в памяти процесса.
+
+    Изменения пользователя в этом процессе сбрасывают кеш сразу,
+    в других процессах — по истечении таймаута.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
+
+
+def _user_changed(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+post_save.connect(_user_changed, sender=settings.AUTH_USER_MODEL)
+post_delete.connect(_user_changed, sender=settings.AUTH_USER_MODEL)
@@ -0,0 +1,119 @@
+"""Общие помощники бенчмарков ya_news и ya_note."""
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import django
+from django.core.management import call_command
+
+
+def setup_django(settings_module, db_path=None, **overrides):
+    """
+    Поднимает Django на отдельной базе SQLite и накатывает миграции.
+
+    Рабочая db.sqlite3 не трогается: по умолчанию база создаётся
+    во временном каталоге. overrides подменяют настройки проекта
+    settings_module.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    from django.conf import settings
+
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    django.setup()
+    return use_database(db_path)
+
+
+def use_database(db_path=None):
+    """Переключает Django на новую базу SQLite с накатанными миграциями."""
+    from django.conf import settings
+    from django.db import connections
+
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    connections.close_all()
+    settings.DATABASES['default']['NAME'] = db_path
+    call_command('migrate', verbosity=0)
+    return db_path
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Перцентили выборки в тех же единицах, что и выборка."""
+    if len(samples) < 2:
+        return {point: (samples[0] if samples else 0.0) for point in points}
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return {point: cuts[point - 1] for point in points}
+
+
+def measure(prepare, repeat):
+    """
+    Замеры одного запроса: перцентили времени, SQL-запросы, пик памяти.
+
+    prepare() готовит данные и возвращает функцию, которая делает
+    сам запрос: в замер попадает только она. Время меряется без
+    tracemalloc, запросы и память — отдельным прогоном.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    prepare()()
+    samples = []
+    for _ in range(repeat):
+        send = prepare()
+        started = time.perf_counter()
+        send()
+        samples.append((time.perf_counter() - started) * 1000)
+    send = prepare()
+    with CaptureQueriesContext(connection) as queries:
+        tracemalloc.start()
+        send()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    result = {
+        f'p{point}': round(value, 3)
+        for point, value in percentiles(samples).items()
+    }
+    result['queries'] = len(queries)
+    result['peak_kib'] = round(peak / 1024, 1)
+    return result
+
+
+def find_regressions(results, baseline, threshold, min_delta_ms=0.5):
+    """
+    Маршруты, которые стали хуже базовой линии.
+
+    Регрессия — медиана выросла больше чем в 1 + threshold раз
+    (и хотя бы на min_delta_ms) или запросов к базе стало больше.
+    """
+    for size, routes in baseline.items():
+        for name, old in routes.items():
+            new = results.get(size, {}).get(name)
+            if new is None:
+                continue
+            slower = new['p50'] - old['p50']
+            if (
+                new['p50'] > old['p50'] * (1 + threshold)
+                and slower > min_delta_ms
+            ):
+                yield (
+                    f'{size} {name}: медиана {old["p50"]:.2f} → '
+                    f'{new["p50"]:.2f} мс'
+                )
+            if new['queries'] > old['queries']:
+                yield (
+                    f'{size} {name}: запросов {old["queries"]} → '
+                    f'{new["queries"]}'
+                )
+
+
+def read_json(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=2, sort_keys=True)
@@ -0,0 +1,37 @@
+from django.db import connections, router, transaction
+
+
+def delete_in_batches(queryset, batch_size, *fields, using=None):
+    """
+    Удаляет строки queryset пачками DELETE ... WHERE id IN (...).
+
+    Каждая пачка — своя короткая транзакция, поэтому удаление тысяч
+    строк не держит блокировку записи всё время. Сигналы не шлются
+    и каскад не выполняется: строки удаляются прямо в базе. Ищем
+    и удаляем в базе для записи модели или в using.
+    Возвращает число удалённых и множество кортежей значений fields
+    удалённых строк: по ним вызывающий чинит то, что от них зависело.
+    """
+    model = queryset.model
+    db = using or router.db_for_write(model)
+    connection = connections[db]
+    quote_name = connection.ops.quote_name
+    sql = 'DELETE FROM {} WHERE {} IN ({{}})'.format(
+        quote_name(model._meta.db_table), quote_name(model._meta.pk.column)
+    )
+    queryset = queryset.using(db).order_by('pk')
+    deleted, values, last_pk = 0, set(), 0
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last_pk).values_list(
+                'pk', *fields
+            )[:batch_size]
+        )
+        if not rows:
+            return deleted, values
+        last_pk = rows[-1][0]
+        values.update(row[1:] for row in rows)
+        pks = [row[0] for row in rows]
+        with transaction.atomic(using=db), connection.cursor() as cursor:
+            cursor.execute(sql.format(', '.join(['%s'] * len(pks))), pks)
+            deleted += cursor.rowcount
@@ -0,0 +1,250 @@
+import cProfile
+import json
+import logging
+import os
+import random
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+request_logger = logging.getLogger(f'{__name__}.requests')
+
+
+class QueryBudgetExceeded(Exception):
+    """Запрос к странице сделал больше SQL-запросов, чем ей положено."""
+
+
+class QueryCounter:
+    """Обёртка для connection.execute_wrapper, считает выполненные запросы."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def count_queries(wrapper):
+    """Подключает обёртку execute_wrapper ко всем соединениям."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+class QueryBudgetMiddleware:
+    """
+    Следит, чтобы страницы укладывались в бюджет SQL-запросов.
+
+    Бюджеты задаются в settings.QUERY_BUDGETS по имени маршрута.
+    При превышении пишет предупреждение в лог или, если
+    settings.QUERY_BUDGET_ACTION == 'raise', выбрасывает исключение.
+    У потоковых ответов считаются и запросы, сделанные при отдаче
+    тела; проверка — после того, как тело отдано целиком.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        budgets = getattr(settings, 'QUERY_BUDGETS', None)
+        if not budgets:
+            return self.get_response(request)
+        counter = QueryCounter()
+        with count_queries(counter):
+            response = self.get_response(request)
+        if response.streaming:
+            # Выгрузки читают базу, пока отдаётся тело ответа.
+            response.streaming_content = self.stream(
+                request, response.streaming_content, counter
+            )
+        else:
+            self.check(request, counter, budgets)
+        return response
+
+    def stream(self, request, content, counter):
+        with count_queries(counter):
+            yield from content
+        self.check(request, counter, settings.QUERY_BUDGETS)
+
+    @staticmethod
+    def check(request, counter, budgets):
+        match = request.resolver_match
+        budget = budgets.get(match.view_name) if match else None
+        if budget is not None and counter.count > budget:
+            message = (
+                f'{match.view_name}: {counter.count} SQL-запросов '
+                f'при бюджете {budget} ({request.method} {request.path})'
+            )
+            if getattr(settings, 'QUERY_BUDGET_ACTION', 'log') == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+
+class QueryTimer:
+    """Обёртка для connection.execute_wrapper, считает запросы и их время."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+class Capture:
+    """
+    Снимок одного запроса: профиль cProfile или память tracemalloc.
+
+    tracemalloc один на процесс, поэтому снимки памяти
+    снимаются по одному: пока идёт один, остальные запросы пропускаются.
+    """
+    tracemalloc_lock = threading.Lock()
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.profiler = None
+        self.snapshot = None
+
+    @classmethod
+    def start(cls, mode):
+        """Запускает снимок; None, если снять его сейчас нельзя."""
+        capture = cls(mode)
+        if mode == 'tracemalloc':
+            if not cls.tracemalloc_lock.acquire(blocking=False):
+                return None
+            tracemalloc.start()
+            return capture
+        capture.profiler = cProfile.Profile()
+        try:
+            capture.profiler.enable()
+        except ValueError:
+            # В потоке уже работает другой профилировщик.
+            return None
+        return capture
+
+    def stop(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+            return
+        try:
+            self.snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+        finally:
+            self.tracemalloc_lock.release()
+
+    def save(self, directory, name):
+        """Пишет снимок в файл и возвращает путь к нему."""
+        os.makedirs(directory, exist_ok=True)
+        if self.profiler is not None:
+            path = os.path.join(directory, f'{name}.prof')
+            self.profiler.dump_stats(path)
+        else:
+            path = os.path.join(directory, f'{name}.tracemalloc')
+            self.snapshot.dump(path)
+        return path
+
+
+class ProfilingMiddleware:
+    """
+    Разбивает время запроса на SQL, шаблоны и остальной Python.
+
+    Итог уходит в заголовок Server-Timing и строкой JSON в лог
+    common.middleware.requests. Доля settings.PROFILE_SAMPLE_RATE
+    запросов снимается целиком (settings.PROFILE_MODE: cProfile
+    или tracemalloc) в каталог settings.PROFILE_DIR. Если задан
+    settings.PROFILE_SLOW_MS, снимаются все запросы, а сохраняются
+    те, что медленнее порога: это заметно замедляет работу.
+
+    Шаблоны считаются от process_template_response до конца рендеринга,
+    render_to_string внутри view попадает во время view.
+    Должен стоять первым в MIDDLEWARE, чтобы видеть весь запрос.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        request._template_time = 0.0
+        timer = QueryTimer()
+        sampled, capture = self.start_capture()
+        try:
+            with count_queries(timer):
+                response = self.get_response(request)
+        finally:
+            if capture is not None:
+                capture.stop()
+        total = (time.perf_counter() - started) * 1000
+        database = timer.duration * 1000
+        template = request._template_time * 1000
+        match = request.resolver_match
+        view = match.view_name if match else None
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'total_ms': round(total, 2),
+            'db_ms': round(database, 2),
+            'queries': timer.count,
+            'template_ms': round(template, 2),
+            'app_ms': round(total - database - template, 2),
+        }
+        if capture is not None and (sampled or self.is_slow(total)):
+            record['profile'] = capture.save(
+                settings.PROFILE_DIR, self.capture_name(view, total)
+            )
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={database:.2f};desc="{timer.count} queries"',
+            f'tpl;dur={template:.2f}',
+            f'app;dur={record["app_ms"]:.2f}',
+            f'total;dur={total:.2f}',
+        ))
+        request_logger.info(json.dumps(record, ensure_ascii=False))
+        return response
+
+    def process_template_response(self, request, response):
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._template_time += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    @staticmethod
+    def start_capture():
+        """Попал ли запрос в выборку и снимок, если его нужно снимать."""
+        rate = getattr(settings, 'PROFILE_SAMPLE_RATE', 0)
+        sampled = random.random() < rate
+        if not sampled and getattr(settings, 'PROFILE_SLOW_MS', None) is None:
+            return sampled, None
+        mode = getattr(settings, 'PROFILE_MODE', 'cprofile')
+        return sampled, Capture.start(mode)
+
+    @staticmethod
+    def is_slow(total):
+        slow_ms = getattr(settings, 'PROFILE_SLOW_MS', None)
+        return slow_ms is not None and total >= slow_ms
+
+    @staticmethod
+    def capture_name(view, total):
+        view = (view or 'unknown').replace(':', '-')
+        return (
+            f'{time.strftime("%Y%m%d-%H%M%S")}-{view}-{total:.0f}ms-'
+            f'{uuid.uuid4().hex[:8]}'
+        )
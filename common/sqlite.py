@@ -0,0 +1,14 @@
+from django.conf import settings
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """
+    Выставляет PRAGMA из settings.SQLITE_PRAGMAS новому соединению.
+
+    Запросы идут мимо курсора Django, поэтому не попадают
+    ни в connection.queries, ни в бюджет запросов страницы.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
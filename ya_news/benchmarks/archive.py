@@ -0,0 +1,96 @@
+"""
+Перенос старых веток в архив: время переноса и страницы новостей.
+
+Генерирует базу командой generate_news за --days дней, замеряет
+страницу свежей и старой новости, переносит ветки старше
+--archive-after дней командой archive_comments и замеряет снова.
+Размер рабочей таблицы и её индексов печатается до и после.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.archive --news 2000 --comments 200000
+"""
+import argparse
+import time
+from datetime import timedelta
+from io import StringIO
+
+from benchmarks.utils import measure, setup_django
+
+
+def table_size(table):
+    """Строки и страницы таблицы вместе с её индексами (dbstat SQLite)."""
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT count(*) FROM {table}')
+        rows = cursor.fetchone()[0]
+        cursor.execute(
+            'SELECT sum(pgsize) FROM dbstat WHERE name = %s OR name IN '
+            "(SELECT name FROM sqlite_master WHERE type = 'index' "
+            'AND tbl_name = %s)',
+            (table, table),
+        )
+        size = cursor.fetchone()[0] or 0
+    return f'{rows} строк, {size / 2 ** 20:.1f} МиБ'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--news', type=int, default=2000)
+    parser.add_argument('--comments', type=int, default=200000)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--archive-after', type=int, default=90)
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    setup_django(ALLOWED_HOSTS=['testserver'], QUERY_BUDGET_ACTION='log')
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.test import Client
+    from django.urls import reverse
+    from django.utils import timezone
+    from news.models import News
+
+    call_command(
+        'generate_news',
+        news=args.news,
+        comments=args.comments,
+        days=args.days,
+        stdout=StringIO(),
+    )
+    cutoff = timezone.localdate() - timedelta(days=args.archive_after)
+    fresh = News.objects.filter(
+        date__gte=cutoff
+    ).order_by('-comment_count').first()
+    old = News.objects.filter(
+        date__lt=cutoff
+    ).order_by('-comment_count').first()
+    client = Client()
+
+    def report(stage):
+        print(f'{stage}: news_comment {table_size("news_comment")}')
+        for name, news in (('свежая', fresh), ('старая', old)):
+            url = reverse('news:detail', args=(news.pk,))
+
+            def prepare():
+                cache.clear()
+                return lambda: client.get(url)
+
+            result = measure(prepare, args.repeat)
+            print(
+                f'  {name} ({news.comment_count} комм.): '
+                f'p50 {result["p50"]:6.2f} мс, '
+                f'{result["queries"]} запросов'
+            )
+
+    report('до')
+    started = time.perf_counter()
+    call_command(
+        'archive_comments', days=args.archive_after, stdout=StringIO()
+    )
+    print(f'перенос: {time.perf_counter() - started:.2f} с')
+    report('после')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Поток новых комментариев: во что обходится подписчик.
+
+Подключает к одной новости N подписчиков через ASGI-приложение
+news.events.CommentEvents (без сервера: receive и send — функции
+в том же цикле событий) и меряет память на подписчика. Затем
+сохраняет комментарии из отдельного потока, как это делает
+представление, и меряет время от начала сохранения до того, как
+событие отправлено всем подписчикам. Без подписчиков то же
+сохранение — базовая линия.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.comment_events --subscribers 100 1000 10000
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from benchmarks.utils import percentiles, setup_django
+
+
+async def run(subscribers, comments, news, author):
+    from django.db import close_old_connections
+    from news.events import CommentEvents, get_broadcaster
+    from news.models import Comment
+
+    async def app(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 404})
+
+    events = CommentEvents(app)
+    broadcaster = get_broadcaster()
+    loop = asyncio.get_running_loop()
+    disconnected = asyncio.Event()
+    state = {'sent': 0, 'done': None}
+
+    async def receive():
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message.get('body', b'').startswith(b'id:'):
+            state['sent'] += 1
+            if state['sent'] == subscribers:
+                state['done'].set()
+
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': f'/news/{news.pk}/events/',
+        'query_string': b'',
+        'headers': [],
+    }
+
+    def save(index):
+        Comment.objects.create(news=news, author=author, text=f'№ {index}')
+        close_old_connections()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = [
+        asyncio.ensure_future(events(scope, receive, send))
+        for _ in range(subscribers)
+    ]
+    while broadcaster.count() < subscribers:
+        await asyncio.sleep(0.01)
+    # Ждём, пока все отправят заголовки и встанут на очереди.
+    await asyncio.sleep(0.1)
+    per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / max(
+        subscribers, 1
+    )
+    tracemalloc.stop()
+
+    samples = []
+    for index in range(comments):
+        state['sent'], state['done'] = 0, asyncio.Event()
+        if not subscribers:
+            state['done'].set()
+        started = time.perf_counter()
+        await loop.run_in_executor(None, save, index)
+        await state['done'].wait()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    disconnected.set()
+    await asyncio.gather(*tasks)
+    return per_subscriber, percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--subscribers', type=int, nargs='+', default=[100, 1000, 10000]
+    )
+    parser.add_argument('--comments', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from news.models import News
+
+    author = get_user_model().objects.create(username='Автор')
+    news = News.objects.create(title='Новость', text='Текст')
+    baseline = None
+    for subscribers in [0, *args.subscribers]:
+        per_subscriber, result = asyncio.run(
+            run(subscribers, args.comments, news, author)
+        )
+        if baseline is None:
+            baseline = result[50]
+        line = (
+            f'{subscribers:>6} подписчиков: '
+            f'сохранение и раздача p50 {result[50]:7.2f} мс '
+            f'p95 {result[95]:7.2f} мс'
+        )
+        if subscribers:
+            fan_out = (result[50] - baseline) / subscribers * 1000
+            line += (
+                f', на подписчика {per_subscriber / 1024:.1f} КиБ '
+                f'и {fan_out:.1f} мкс раздачи'
+            )
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Пропускная способность добавления комментариев: напрямую и через очередь.
+
+Потоки-клиенты одновременно отправляют комментарии к одной новости
+через страницу новости, как при наплыве читателей. Прогон делается
+дважды на копиях одной базы: каждая запись в своей транзакции
+и с очередью записи (settings.COMMENT_INGEST_QUEUE).
+
+Запуск из каталога ya_news:
+    python -m benchmarks.comment_ingest --clients 16 --duration 10
+"""
+import argparse
+import os
+import shutil
+import threading
+import time
+
+from benchmarks.utils import percentiles, setup_django
+
+
+def seed(clients):
+    from django.contrib.auth import get_user_model
+    from news.models import News
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f'user{index}') for index in range(clients)
+    )
+    News.objects.create(title='Горячая новость', text='Текст новости.')
+    return list(User.objects.all())
+
+
+def client_loop(user, url, deadline, samples, errors):
+    from django.db import connection
+    from django.test import Client
+
+    client = Client()
+    client.force_login(user)
+    step = 0
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        response = client.post(url, {'text': f'Комментарий {step}'})
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code == 302:
+            samples.append(elapsed)
+        else:
+            errors.append(response.status_code)
+        step += 1
+    connection.close()
+
+
+def run(users, duration):
+    from django.urls import reverse
+    from news.models import News
+
+    url = reverse('news:detail', args=(News.objects.get().pk,))
+    samples, errors = [], []
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(
+            target=client_loop,
+            args=(user, url, deadline, samples, errors),
+        )
+        for user in users
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument(
+        '--production',
+        action='store_true',
+        help='Включить PRAGMA из yanews.settings_production.',
+    )
+    args = parser.parse_args()
+
+    template = setup_django(
+        ALLOWED_HOSTS=['testserver'], QUERY_BUDGET_ACTION='log'
+    )
+    from django.conf import settings
+    from django.db import connections
+    from news.models import News
+    from yanews import settings_production
+
+    users = seed(args.clients)
+    connections.close_all()
+    if args.production:
+        settings.SQLITE_PRAGMAS = settings_production.SQLITE_PRAGMAS
+    for name, use_queue in (('direct', False), ('queue', True)):
+        db_path = os.path.join(
+            os.path.dirname(template), f'{name}.sqlite3'
+        )
+        shutil.copy(template, db_path)
+        settings.DATABASES['default']['NAME'] = db_path
+        settings.COMMENT_INGEST_QUEUE = use_queue
+        samples, errors = run(users, args.duration)
+        saved = News.objects.get().comment_count
+        latency = percentiles(samples)
+        print(
+            f'{name:>6}: {saved / args.duration:7.0f} комментариев/с, '
+            f'ошибок {len(errors):4}, '
+            f'p50/p95/p99 {latency[50]:6.1f}/{latency[95]:6.1f}/'
+            f'{latency[99]:6.1f} мс'
+        )
+        connections.close_all()
+
+
+if __name__ == '__main__':
+    main()
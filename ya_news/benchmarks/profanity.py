@@ -0,0 +1,67 @@
+"""
+Сравнение проверки комментария на запрещённые слова.
+
+Старый способ — отдельный поиск `in` по каждому слову списка,
+новый — автомат Ахо — Корасик из news.profanity.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.profanity --words 5000 --length 2000
+"""
+import argparse
+import random
+import timeit
+
+from news.profanity import ProfanityMatcher
+
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщъыьэюя'
+
+
+def loop_search(words, text):
+    """Проверка, которая раньше была в CommentForm.clean_text."""
+    lowered_text = text.lower()
+    for word in words:
+        if word in lowered_text:
+            return True
+    return False
+
+
+def random_word(rng, min_length=5, max_length=12):
+    length = rng.randint(min_length, max_length)
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--words', type=int, default=5000)
+    parser.add_argument('--length', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = [random_word(rng, 8, 12) for _ in range(args.words)]
+    # Чистый текст — худший случай: просматриваются все слова.
+    text = ''
+    while len(text) < args.length:
+        text += random_word(rng, 2, 7) + ' '
+
+    started = timeit.default_timer()
+    matcher = ProfanityMatcher(words)
+    build_time = timeit.default_timer() - started
+    assert loop_search(words, text) == matcher.search(text)
+
+    loop_time = timeit.timeit(
+        lambda: loop_search(words, text), number=args.repeat
+    ) / args.repeat
+    matcher_time = timeit.timeit(
+        lambda: matcher.search(text), number=args.repeat
+    ) / args.repeat
+    print(f'слов: {args.words}, длина текста: {len(text)}')
+    print(f'построение автомата: {build_time * 1000:.2f} мс')
+    print(f'цикл по словам:      {loop_time * 1000:.3f} мс на текст')
+    print(f'автомат:             {matcher_time * 1000:.3f} мс на текст')
+    print(f'ускорение:           {loop_time / matcher_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Удаление новости с большой веткой: каскадом Django и через purge().
+
+Создаёт новость с --comments комментариями и удаляет её сначала
+каскадом Django (QuerySet.delete() в обход NewsQuerySet), потом,
+на новой такой же новости, методом NewsQuerySet.purge(). Для
+каждого способа печатает общее время, пик памяти и самую долгую
+транзакцию: всё это время остальные писатели ждут блокировку SQLite.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.purge --comments 10000
+
+Каскад шлёт сигнал на каждый комментарий и на 10 000 комментариев
+идёт больше минуты; больше брать имеет смысл только для purge()
+(--purge-only).
+"""
+import argparse
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from benchmarks.utils import setup_django
+
+
+def seed(count):
+    from django.contrib.auth import get_user_model
+    from django.db import connection, transaction
+    from news.models import Comment, News, render_comment
+
+    author, _ = get_user_model().objects.get_or_create(username='bench')
+    news = News.objects.create(title='Горячая новость', text='Текст')
+    sql = (
+        f'INSERT INTO {Comment._meta.db_table} '
+        '(news_id, author_id, text, text_html, created) '
+        "VALUES (%s, %s, %s, %s, '2024-01-01 00:00:00')"
+    )
+    text = 'Комментарий\nв две строки'
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            (news.pk, author.pk, text, render_comment(text))
+        ] * count)
+    News.objects.filter(pk=news.pk).recount_comments()
+    return news.pk
+
+
+@contextmanager
+def track_transactions(durations):
+    """Записывает длительность каждой внешней транзакции atomic()."""
+    from django.db import connection, transaction
+
+    enter, exit_ = transaction.Atomic.__enter__, transaction.Atomic.__exit__
+    started = []
+
+    def timed_enter(self):
+        if not connection.in_atomic_block:
+            started.append(time.perf_counter())
+        return enter(self)
+
+    def timed_exit(self, *args):
+        result = exit_(self, *args)
+        if not connection.in_atomic_block:
+            durations.append((time.perf_counter() - started.pop()) * 1000)
+        return result
+
+    transaction.Atomic.__enter__ = timed_enter
+    transaction.Atomic.__exit__ = timed_exit
+    try:
+        yield
+    finally:
+        transaction.Atomic.__enter__ = enter
+        transaction.Atomic.__exit__ = exit_
+
+
+def run(name, delete):
+    durations = []
+    tracemalloc.start()
+    started = time.perf_counter()
+    with track_transactions(durations):
+        delete()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f'{name:>8}: {elapsed:7.2f} с, пик {peak / 2 ** 20:7.1f} МиБ, '
+        f'самая долгая транзакция {max(durations, default=0):8.1f} мс'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--comments', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--purge-only', action='store_true')
+    args = parser.parse_args()
+
+    setup_django(QUERY_BUDGET_ACTION='log')
+    from django.db.models import QuerySet
+    from news.models import News
+
+    if not args.purge_only:
+        pk = seed(args.comments)
+        run('каскад', lambda: QuerySet.delete(News.objects.filter(pk=pk)))
+    pk = seed(args.comments)
+    run('purge', lambda: News.objects.filter(pk=pk).purge(args.batch_size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""
+Время, SQL-запросы и память каждого маршрута на данных разного размера.
+
+Для каждого размера генерирует базу командой generate_news
+(size новостей, в десять раз больше комментариев), прогоняет
+через тестовый клиент все маршруты news/urls.py и входа,
+а результат пишет в JSON. Если задана базовая линия, сравнивает
+с ней и завершается с кодом 1, когда маршрут стал медленнее
+порога или делает больше запросов.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.routes --sizes 1000 10000 --output routes.json
+    python -m benchmarks.routes --baseline routes.json --threshold 0.2
+"""
+import argparse
+import itertools
+import sys
+from io import StringIO
+
+from benchmarks.utils import (
+    find_regressions, measure, read_json, setup_django, use_database,
+    write_json
+)
+
+PASSWORD = 'load-test'
+
+
+def request(client, method, url, data=None):
+    """Функция, которая делает запрос и проверяет, что он удался."""
+
+    def send():
+        response = getattr(client, method)(url, data)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{method.upper()} {url}: {response}')
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+
+    return send
+
+
+def make_cases():
+    """Случаи по маршрутам: имя маршрута → {название: prepare}."""
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from django.urls import reverse
+    from news.models import Comment, News
+
+    User = get_user_model()
+    author = User.objects.create_user(username='bench', password=PASSWORD)
+    staff = User.objects.create_user(
+        username='bench_staff', password=PASSWORD, is_staff=True
+    )
+    anonymous, author_client, staff_client = Client(), Client(), Client()
+    author_client.force_login(author)
+    staff_client.force_login(staff)
+    hot = News.objects.order_by('-comment_count').first()
+    detail_url = reverse('news:detail', args=(hot.pk,))
+    comment = Comment.objects.create(news=hot, author=author, text='Замер')
+    word = hot.title.split()[0]
+    counter = itertools.count()
+
+    def new_comment():
+        return Comment.objects.create(news=hot, author=author, text='Удалить')
+
+    def logged_out_client():
+        client = Client()
+        client.force_login(author)
+        return client
+
+    return {
+        'news:home': {
+            'GET': lambda: request(anonymous, 'get', reverse('news:home')),
+        },
+        'news:archive': {
+            'GET': lambda: request(
+                anonymous, 'get', reverse('news:archive')
+            ),
+        },
+        'news:search': {
+            'GET': lambda: request(
+                anonymous, 'get', reverse('news:search'), {'q': word}
+            ),
+        },
+        'news:detail': {
+            'GET': lambda: request(anonymous, 'get', detail_url),
+            'GET author': lambda: request(author_client, 'get', detail_url),
+            'POST': lambda: request(
+                author_client, 'post', detail_url, {'text': 'Новый'}
+            ),
+        },
+        'news:edit': {
+            'GET': lambda: request(
+                author_client, 'get',
+                reverse('news:edit', args=(comment.pk,)),
+            ),
+            'POST': lambda: request(
+                author_client, 'post',
+                reverse('news:edit', args=(comment.pk,)),
+                {'text': 'Правка'},
+            ),
+        },
+        'news:delete': {
+            'GET': lambda: request(
+                author_client, 'get',
+                reverse('news:delete', args=(comment.pk,)),
+            ),
+            'POST': lambda: request(
+                author_client, 'post',
+                reverse('news:delete', args=(new_comment().pk,)),
+            ),
+        },
+        'news:export': {
+            'GET': lambda: request(
+                staff_client, 'get', reverse('news:export', args=('news',))
+            ),
+        },
+        'users:login': {
+            'GET': lambda: request(anonymous, 'get', reverse('users:login')),
+            'POST': lambda: request(
+                Client(), 'post', reverse('users:login'),
+                {'username': 'bench', 'password': PASSWORD},
+            ),
+        },
+        'users:logout': {
+            'GET': lambda: request(
+                logged_out_client(), 'get', reverse('users:logout')
+            ),
+        },
+        'users:signup': {
+            'GET': lambda: request(anonymous, 'get', reverse('users:signup')),
+            'POST': lambda: request(
+                Client(), 'post', reverse('users:signup'),
+                {
+                    'username': f'newcomer{next(counter)}',
+                    'password1': PASSWORD,
+                    'password2': PASSWORD,
+                },
+            ),
+        },
+    }
+
+
+def route_names():
+    from news.urls import urlpatterns
+    from yanews.urls import auth_urls
+
+    return [f'news:{pattern.name}' for pattern in urlpatterns] + [
+        f'users:{pattern.name}' for pattern in auth_urls[0]
+    ]
+
+
+def run_size(size, repeat, cold):
+    from django.core.cache import cache
+    from django.core.management import call_command
+
+    use_database()
+    cache.clear()
+    call_command(
+        'generate_news',
+        users=max(10, size // 100),
+        news=size,
+        comments=size * 10,
+        days=max(1, size // 50),
+        stdout=StringIO(),
+    )
+    cases = make_cases()
+    missing = set(route_names()) - set(cases)
+    if missing:
+        raise SystemExit(f'Нет замеров для маршрутов: {sorted(missing)}')
+    results = {}
+    for route, variants in cases.items():
+        for variant, prepare in variants.items():
+            if cold:
+                prepare = with_cold_cache(prepare)
+            name = f'{route} {variant}'
+            results[name] = measure(prepare, repeat)
+            print(
+                f'{size:>8} {name:<22} '
+                f'p50 {results[name]["p50"]:8.2f} мс '
+                f'p99 {results[name]["p99"]:8.2f} мс '
+                f'{results[name]["queries"]:3} запросов '
+                f'{results[name]["peak_kib"]:9.1f} КиБ'
+            )
+    return results
+
+
+def with_cold_cache(prepare):
+    from django.core.cache import cache
+
+    def prepare_cold():
+        send = prepare()
+        cache.clear()
+        return send
+
+    return prepare_cold
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[1000, 10000]
+    )
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument(
+        '--cold',
+        action='store_true',
+        help='Очищать кеш перед каждым запросом.',
+    )
+    parser.add_argument('--output', help='Куда записать результаты.')
+    parser.add_argument('--baseline', help='Результаты для сравнения.')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.2,
+        help='Допустимый рост медианы, доля от базовой линии.',
+    )
+    args = parser.parse_args()
+
+    setup_django(ALLOWED_HOSTS=['testserver'], QUERY_BUDGET_ACTION='log')
+    results = {
+        str(size): run_size(size, args.repeat, args.cold)
+        for size in args.sizes
+    }
+    if args.output:
+        write_json(args.output, results)
+    if args.baseline:
+        regressions = list(find_regressions(
+            results, read_json(args.baseline), args.threshold
+        ))
+        for regression in regressions:
+            print(f'Регрессия: {regression}')
+        if regressions:
+            sys.exit(1)
+        print('Регрессий нет.')
+
+
+if __name__ == '__main__':
+    main()
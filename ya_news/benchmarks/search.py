@@ -0,0 +1,97 @@
+"""
+Сравнение полнотекстового поиска FTS5 с фильтром text__icontains.
+
+Генерирует корпус новостей во временной базе и для нескольких слов
+измеряет время первой страницы результатов обоими способами.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.search --size 1000000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.utils import percentiles, setup_django
+
+SYLLABLES = (
+    'ба', 'ве', 'го', 'да', 'же', 'зи', 'ка', 'ло', 'ми', 'но',
+    'пу', 'ра', 'се', 'то', 'фу', 'ха', 'це', 'чи', 'ша', 'юн',
+)
+
+
+def make_vocabulary(rng, size):
+    return list({
+        ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        for _ in range(size)
+    })
+
+
+def generate(size, rng, vocabulary, batch_size=10000):
+    from django.db import connection, transaction
+
+    # Частые слова встречаются чаще редких, как в живом тексте.
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    from django.utils import timezone
+
+    # Начало текста для главной поиску не нужно: excerpt пустой.
+    sql = 'INSERT INTO news_news (title, text, excerpt, date, ' \
+          'comment_count, comments_archived, changed_at) ' \
+          "VALUES (%s, %s, '', %s, 0, 0, %s)"
+    changed_at = str(timezone.now())
+    for start in range(0, size, batch_size):
+        rows = []
+        for _ in range(min(batch_size, size - start)):
+            words = rng.choices(vocabulary, weights, k=60)
+            rows.append((
+                ' '.join(words[:5]).capitalize(),
+                ' '.join(words[5:]),
+                f'20{rng.randint(10, 23)}-{rng.randint(1, 12):02}-01',
+                changed_at,
+            ))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+
+
+def measure(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    from news.models import News
+    from news.search import search_news
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng, 20000)
+    started = time.perf_counter()
+    generate(args.size, rng, vocabulary)
+    print(
+        f'корпус: {args.size} новостей за '
+        f'{time.perf_counter() - started:.1f} с'
+    )
+    # Частое, среднее и редкое слово.
+    for word in (vocabulary[0], vocabulary[500], vocabulary[-1]):
+        icontains = measure(
+            lambda: list(News.objects.filter(text__icontains=word)[:20]),
+            args.repeat,
+        )
+        fts = measure(lambda: search_news(word, limit=20), args.repeat)
+        print(
+            f'{word:>10}: icontains p50 {icontains[50]:8.2f} мс, '
+            f'FTS5 p50 {fts[50]:8.2f} мс'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+SQL-запросы на страницу с сессиями в базе и в подписанной cookie.
+
+Сравнивает настройки по умолчанию (сессии в таблице, пользователь
+из базы на каждый запрос) с yanews.settings_production (сессия
+в cookie, пользователь из кеша процесса) для гостя и вошедшего
+пользователя. Кеш главной очищается перед каждым запросом.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.sessions
+"""
+import argparse
+import time
+
+from benchmarks.utils import setup_django
+
+PASSWORD = 'load-test'
+
+
+def count_queries(client, url, repeat):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    client.get(url)
+    queries, elapsed = 0, 0.0
+    for _ in range(repeat):
+        cache.clear()
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as captured:
+            client.get(url)
+        elapsed += time.perf_counter() - started
+        queries += len(captured)
+    return queries / repeat, elapsed / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django(ALLOWED_HOSTS=['testserver'], QUERY_BUDGET_ACTION='log')
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from django.urls import reverse
+    from news.models import Comment, News
+    from yanews import settings_production
+
+    user = get_user_model().objects.create_user(
+        username='bench', password=PASSWORD
+    )
+    news = News.objects.create(title='Новость', text='Текст')
+    Comment.objects.create(news=news, author=user, text='Комментарий')
+    urls = {
+        'home': reverse('news:home'),
+        'detail': reverse('news:detail', args=(news.pk,)),
+        'archive': reverse('news:archive'),
+    }
+    profiles = (
+        ('default', settings.SESSION_ENGINE, settings.MIDDLEWARE),
+        (
+            'production',
+            settings_production.SESSION_ENGINE,
+            settings_production.MIDDLEWARE,
+        ),
+    )
+    for profile, engine, middleware in profiles:
+        settings.SESSION_ENGINE = engine
+        settings.MIDDLEWARE = middleware
+        # Клиент собирает цепочку middleware при создании.
+        anonymous, member = Client(), Client()
+        member.login(username='bench', password=PASSWORD)
+        for name, url in urls.items():
+            for who, client in (('гость', anonymous), ('вошёл', member)):
+                queries, latency = count_queries(client, url, args.repeat)
+                print(
+                    f'{profile:>10} {name:>8} {who:>6}: '
+                    f'{queries:4.1f} запросов, {latency:6.2f} мс'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Страницы для гостя: через представление и из готового снимка.
+
+Генерирует базу командой generate_news, снимает главную и самую
+обсуждаемую новость командой publish_snapshots и сравнивает время
+и SQL-запросы анонимного GET с выключенными и включёнными снимками.
+Кеш главной очищается перед каждым запросом к представлению.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.snapshots --news 1000
+"""
+import argparse
+import tempfile
+from io import StringIO
+
+from benchmarks.utils import measure, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--news', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django(ALLOWED_HOSTS=['testserver'], QUERY_BUDGET_ACTION='log')
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.test import Client
+    from django.urls import reverse
+    from news.models import News
+
+    call_command(
+        'generate_news',
+        news=args.news,
+        comments=args.news * 10,
+        days=max(1, args.news // 50),
+        stdout=StringIO(),
+    )
+    hot = News.objects.order_by('-comment_count').first()
+    urls = {
+        'home': reverse('news:home'),
+        'detail': reverse('news:detail', args=(hot.pk,)),
+    }
+    snapshot_dir = tempfile.mkdtemp()
+    for name, url in urls.items():
+        for snapshots in (None, snapshot_dir):
+            settings.SNAPSHOT_DIR = snapshots
+            if snapshots:
+                call_command('publish_snapshots', stdout=StringIO())
+            client = Client()
+
+            def prepare():
+                cache.clear()
+                return lambda: client.get(url)
+
+            result = measure(prepare, args.repeat)
+            label = 'снимок' if snapshots else 'представление'
+            print(
+                f'{name:>8} {label:>14}: p50 {result["p50"]:7.2f} мс '
+                f'p99 {result["p99"]:7.2f} мс {result["queries"]} запросов'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+Нагрузочный тест SQLite: комментарии пишутся, пока новости читаются.
+
+Потоки-писатели добавляют комментарии, потоки-читатели одновременно
+читают главную и ветки комментариев. Прогон делается дважды на копиях
+одной базы: с настройками SQLite по умолчанию и с профилем
+из yanews.settings_production. Для каждого печатает число операций
+в секунду, ошибки «database is locked» и перцентили времени записи,
+почти всё из которого — ожидание блокировки.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.sqlite_contention --writers 8 --readers 8
+"""
+import argparse
+import os
+import shutil
+import threading
+import time
+
+from benchmarks.utils import percentiles, setup_django
+
+
+class Stats:
+    """Замеры одного прогона, общие для всех потоков."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.writes = []
+        self.reads = []
+        self.locked = 0
+
+    def add(self, samples, elapsed):
+        with self.lock:
+            samples.append(elapsed)
+
+    def add_locked(self):
+        with self.lock:
+            self.locked += 1
+
+
+def seed(news_count, users_count):
+    from django.contrib.auth import get_user_model
+    from news.models import News
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f'user{index}') for index in range(users_count)
+    )
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст новости.')
+        for index in range(news_count)
+    )
+    return (
+        list(User.objects.values_list('pk', flat=True)),
+        list(News.objects.values_list('pk', flat=True)),
+    )
+
+
+def timed(stats, samples, operation):
+    from django.db import OperationalError
+
+    started = time.perf_counter()
+    try:
+        operation()
+    except OperationalError as error:
+        if 'locked' not in str(error):
+            raise
+        stats.add_locked()
+        return
+    stats.add(samples, (time.perf_counter() - started) * 1000)
+
+
+def writer(stats, deadline, user_ids, news_ids, number):
+    from django.db import connection, transaction
+    from news.models import Comment
+
+    def post():
+        with transaction.atomic():
+            Comment.objects.create(
+                news_id=news_ids[step % len(news_ids)],
+                author_id=user_ids[number % len(user_ids)],
+                text=f'Комментарий {number}-{step}',
+            )
+
+    step = 0
+    while time.monotonic() < deadline:
+        timed(stats, stats.writes, post)
+        step += 1
+    connection.close()
+
+
+def reader(stats, deadline, news_ids, number):
+    from django.conf import settings
+    from django.db import connection
+    from news.models import Comment, News
+
+    def read():
+        list(News.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE])
+        list(
+            Comment.objects.filter(
+                news_id=news_ids[step % len(news_ids)]
+            ).select_related('author').reverse()[:50]
+        )
+
+    step = number
+    while time.monotonic() < deadline:
+        timed(stats, stats.reads, read)
+        step += 1
+    connection.close()
+
+
+def run(args, user_ids, news_ids):
+    stats = Stats()
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(
+            target=writer,
+            args=(stats, deadline, user_ids, news_ids, number),
+        )
+        for number in range(args.writers)
+    ] + [
+        threading.Thread(
+            target=reader, args=(stats, deadline, news_ids, number)
+        )
+        for number in range(args.readers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats
+
+
+def report(name, stats, duration):
+    writes = percentiles(stats.writes)
+    reads = percentiles(stats.reads)
+    print(
+        f'{name:>10}: записей {len(stats.writes) / duration:7.0f}/с, '
+        f'чтений {len(stats.reads) / duration:7.0f}/с, '
+        f'locked {stats.locked:5}, '
+        f'запись p50/p95/p99 {writes[50]:6.1f}/{writes[95]:6.1f}/'
+        f'{writes[99]:6.1f} мс, '
+        f'чтение p95 {reads[95]:6.1f} мс'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--news', type=int, default=100)
+    args = parser.parse_args()
+
+    template = setup_django()
+    from django.conf import settings
+    from django.db import connections
+    from yanews import settings_production
+
+    user_ids, news_ids = seed(args.news, args.writers)
+    connections.close_all()
+    profiles = (
+        # Python ждёт блокировку 5 секунд и без busy_timeout.
+        ('default', {}),
+        ('production', settings_production.SQLITE_PRAGMAS),
+    )
+    for name, pragmas in profiles:
+        db_path = os.path.join(
+            os.path.dirname(template), f'{name}.sqlite3'
+        )
+        shutil.copy(template, db_path)
+        settings.DATABASES['default']['NAME'] = db_path
+        settings.SQLITE_PRAGMAS = pragmas
+        report(name, run(args, user_ids, news_ids), args.duration)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+import sys
+from pathlib import Path
+
+# Общий для обоих проектов код лежит в корне репозитория.
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from common import benchmarks  # noqa: E402
+from common.benchmarks import (  # noqa: E402, F401
+    find_regressions, measure, percentiles, read_json, use_database,
+    write_json,
+)
+
+
+def setup_django(db_path=None, **overrides):
+    """Поднимает Django с настройками yanews.settings на отдельной базе."""
+    return benchmarks.setup_django('yanews.settings', db_path, **overrides)
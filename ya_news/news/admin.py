@@ -1,15 +1,149 @@
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.html import format_html
 
-from .models import Comment, News
+from common.admin import BatchDeleteMixin, BatchDeleteUserAdmin
 
+from .models import ArchivedComment, Comment, News
+from .moderation import delete_comments, delete_users
 
-class CommentInline(admin.StackedInline):
+User = get_user_model()
+
+
+class LatestCommentsFormSet(BaseInlineFormSet):
+    """
+    Только последние комментарии: вся ветка не влезет в страницу.
+
+    При сохранении берём те комментарии, что были на странице, а не
+    последние на этот момент: иначе новые комментарии сдвинут срез,
+    и правка старого из показанных молча потеряется.
+    """
+
+    def get_queryset(self):
+        if not hasattr(self, '_latest'):
+            queryset = super().get_queryset().select_related(
+                'author'
+            ).order_by('-created', '-id')
+            if self.is_bound:
+                self._latest = queryset.filter(pk__in=self.get_shown_pks())
+            else:
+                self._latest = queryset[
+                    :settings.COMMENTS_COUNT_IN_ADMIN_INLINE
+                ]
+        return self._latest
+
+    def get_shown_pks(self):
+        """Комментарии, которые были на странице: их id из формы."""
+        pk_name = self.model._meta.pk.name
+        pks = (
+            self.data.get(f'{self.add_prefix(index)}-{pk_name}', '')
+            for index in range(self.initial_form_count())
+        )
+        return [int(pk) for pk in pks if pk.isdigit()]
+
+
+class CommentInline(admin.TabularInline):
     model = Comment
+    formset = LatestCommentsFormSet
     extra = 0
+    raw_id_fields = ('author',)
+    readonly_fields = ('created',)
 
 
 @admin.register(News)
-class NewsAdmin(admin.ModelAdmin):
+class NewsAdmin(BatchDeleteMixin, admin.ModelAdmin):
     inlines = [
         CommentInline,
     ]
+    list_display = ('title', 'date', 'comment_count')
+    search_fields = ('title',)
+    readonly_fields = ('comment_count', 'all_comments')
+    # COUNT(*) по всей таблице на каждой странице списка не нужен.
+    show_full_result_count = False
+
+    @admin.display(description='Все комментарии')
+    def all_comments(self, news):
+        url = reverse('admin:news_comment_changelist')
+        return format_html(
+            '<a href="{}?news__id__exact={}">{} шт.</a>',
+            url, news.pk, news.comment_count,
+        )
+
+    def get_deleted_objects(self, objs, request):
+        """
+        Вместо списка всех комментариев на странице подтверждения
+        показываем только их число.
+        """
+        objs = list(objs)
+        comments = sum(news.comment_count for news in objs)
+        perms_needed = set()
+        if comments and not request.user.has_perm('news.delete_comment'):
+            perms_needed.add(Comment._meta.verbose_name)
+        to_delete = [
+            f'{News._meta.verbose_name}: {news} '
+            f'(комментариев: {news.comment_count})'
+            for news in objs
+        ]
+        model_count = {
+            News._meta.verbose_name_plural: len(objs),
+            Comment._meta.verbose_name_plural: comments,
+        }
+        return to_delete, model_count, perms_needed, []
+
+    def delete_model(self, request, obj):
+        News.objects.filter(pk=obj.pk).purge()
+
+    def delete_queryset(self, request, queryset):
+        queryset.purge()
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'news', 'author', 'created')
+    list_select_related = ('news', 'author')
+    raw_id_fields = ('news', 'author')
+    search_fields = ('=author__username',)
+    show_full_result_count = False
+    actions = ('delete_spam',)
+
+    @admin.action(description='Удалить как спам', permissions=('delete',))
+    def delete_spam(self, request, queryset):
+        """Без страницы подтверждения и записи в журнал на каждый объект."""
+        deleted = delete_comments(queryset)
+        self.message_user(request, f'Удалено комментариев: {deleted}.')
+
+    def delete_model(self, request, obj):
+        delete_comments(Comment.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        delete_comments(queryset)
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class CommentAuthorAdmin(BatchDeleteUserAdmin):
+    """Пользователи удаляются вместе с комментариями пачками."""
+    related_model = Comment
+    count_label = 'комментариев'
+    delete_users = staticmethod(delete_users)
+
+
+@admin.register(ArchivedComment)
+class ArchivedCommentAdmin(admin.ModelAdmin):
+    """Архив только для чтения: комментарии сюда переносит news.archive."""
+    list_display = ('__str__', 'news', 'author', 'created')
+    list_select_related = ('news', 'author')
+    raw_id_fields = ('news', 'author')
+    search_fields = ('=author__username',)
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
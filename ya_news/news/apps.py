@@ -1,7 +1,16 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
     verbose_name = 'Новости'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from common.sqlite import apply_pragmas
+
+        connection_created.connect(
+            apply_pragmas, dispatch_uid='common.sqlite.apply_pragmas'
+        )
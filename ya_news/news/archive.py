@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import ArchivedComment, Comment, News
+
+BATCH_SIZE = 10000
+# Больше новостей в пачке не берём, даже если комментариев у них мало.
+MAX_NEWS_IN_BATCH = 500
+COLUMNS = ('id', 'news_id', 'author_id', 'text', 'text_html', 'created')
+
+
+def _move(source, target, news_ids):
+    """Переносит ветки новостей из одной таблицы комментариев в другую."""
+    columns = ', '.join(COLUMNS)
+    placeholders = ', '.join(['%s'] * len(news_ids))
+    where = f'WHERE news_id IN ({placeholders})'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {target._meta.db_table} ({columns}) '
+            f'SELECT {columns} FROM {source._meta.db_table} {where}',
+            news_ids,
+        )
+        cursor.execute(
+            f'DELETE FROM {source._meta.db_table} {where}', news_ids
+        )
+        return cursor.rowcount
+
+
+def archive_news(news_ids):
+    """
+    Переносит ветки новостей в архив одной транзакцией.
+
+    INSERT ... SELECT и DELETE выполняются в базе, комментарии
+    в Python не загружаются. Возвращает число перенесённых.
+    """
+    news_ids = list(news_ids)
+    with transaction.atomic():
+        moved = _move(Comment, ArchivedComment, news_ids)
+        News.objects.filter(pk__in=news_ids).update(comments_archived=True)
+    return moved
+
+
+def iter_batches(news, batch_size):
+    """
+    Группирует новости (id, число комментариев) в пачки примерно
+    по batch_size комментариев, но не больше MAX_NEWS_IN_BATCH
+    новостей; большая ветка идёт отдельной пачкой.
+    """
+    batch, size = [], 0
+    for pk, comment_count in news:
+        if batch and (
+            size + comment_count > batch_size
+            or len(batch) >= MAX_NEWS_IN_BATCH
+        ):
+            yield batch
+            batch, size = [], 0
+        batch.append(pk)
+        size += comment_count
+    if batch:
+        yield batch
+
+
+def archive_old_news(days, batch_size=BATCH_SIZE):
+    """
+    Переносит в архив ветки новостей старше days дней.
+
+    Заодно досылает в архив новые комментарии к уже архивным
+    новостям: они пишутся в рабочую таблицу. Каждая пачка — своя
+    короткая транзакция. Возвращает число новостей
+    и перенесённых комментариев.
+    """
+    cutoff = timezone.localdate() - timedelta(days=days)
+    news = list(
+        News.objects.filter(
+            date__lt=cutoff, comments_archived=False
+        ).order_by('pk').values_list('pk', 'comment_count')
+    )
+    news += Comment.objects.filter(
+        news__comments_archived=True
+    ).order_by('news_id').values('news_id').annotate(
+        count=Count('pk')
+    ).values_list('news_id', 'count')
+    moved = 0
+    for news_ids in iter_batches(news, batch_size):
+        moved += archive_news(news_ids)
+    return len(news), moved
@@ -0,0 +1,73 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import News
+
+NEWS_TOTAL_KEY = 'news:total'
+HOME_PAGE_KEY = 'news:home'
+# Сколько секунд держится блокировка пересборки и как часто её проверяют.
+REBUILD_LOCK_TIMEOUT = 10
+REBUILD_POLL_INTERVAL = 0.05
+
+
+def get_news_total():
+    """Число новостей из кеша: не считаем его на каждой странице."""
+    return cache.get_or_set(
+        NEWS_TOTAL_KEY,
+        News.objects.count,
+        settings.NEWS_TOTAL_CACHE_TIMEOUT,
+    )
+
+
+def reset_news_total():
+    """Число новостей пересчитается при следующем обращении."""
+    cache.delete(NEWS_TOTAL_KEY)
+
+
+def get_or_rebuild(key, build, timeout):
+    """
+    Берёт значение из кеша, а при промахе собирает его один раз.
+
+    Пересобирает тот, кто первым занял блокировку `cache.add`,
+    остальные ждут готовое значение и не идут в базу одновременно.
+    Если сборка не успела за REBUILD_LOCK_TIMEOUT, собираем сами.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, True, REBUILD_LOCK_TIMEOUT):
+        try:
+            value = build()
+            cache.set(key, value, timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+    deadline = time.monotonic() + REBUILD_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(REBUILD_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return build()
+
+
+def get_home_page(build):
+    """Общая для всех посетителей часть главной страницы."""
+    return get_or_rebuild(
+        HOME_PAGE_KEY, build, settings.HOME_PAGE_CACHE_TIMEOUT
+    )
+
+
+def invalidate_home_page():
+    """
+    Сбрасывает главную страницу сразу и ещё раз после коммита.
+
+    Повторный сброс убирает копию, которую мог собрать параллельный
+    запрос, пока транзакция с изменением ещё не была видна.
+    """
+    cache.delete(HOME_PAGE_KEY)
+    transaction.on_commit(lambda: cache.delete(HOME_PAGE_KEY))
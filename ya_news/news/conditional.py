@@ -0,0 +1,74 @@
+import hashlib
+from datetime import datetime, time
+
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .models import Comment, News
+
+
+def get_news_state(request, pk):
+    """
+    Всё, от чего зависит страница новости, одним небольшим запросом.
+
+    Результат запоминается на запросе: его используют и ETag,
+    и Last-Modified. Для несуществующей новости возвращает None.
+    """
+    if not hasattr(request, '_news_state'):
+        last_comment = Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by('-created').values('created')[:1]
+        request._news_state = News.objects.filter(pk=pk).annotate(
+            last_comment=Subquery(last_comment)
+        ).values(
+            'date', 'comment_count', 'changed_at', 'last_comment'
+        ).first()
+    return request._news_state
+
+
+def news_etag(request, pk):
+    """
+    Значение ETag для страницы новости.
+
+    Страница вошедшего пользователя содержит форму с CSRF-токеном,
+    поэтому в ETag входят и сессия, и токен: после нового входа
+    (сессия и токен меняются) браузер получит свежую страницу,
+    а не 304 со старой формой.
+    """
+    state = get_news_state(request, pk)
+    if state is None:
+        return None
+    # Снимки для гостей (news.snapshots) рендерятся без сессии.
+    session = getattr(request, 'session', None)
+    parts = (
+        pk,
+        state['comment_count'],
+        state['last_comment'],
+        state['changed_at'],
+        request.user.pk,
+        session and session.session_key,
+        request.META.get('CSRF_COOKIE'),
+        request.GET.get('cursor'),
+    )
+    return hashlib.md5(
+        ':'.join(map(str, parts)).encode()
+    ).hexdigest()
+
+
+def news_last_modified(request, pk):
+    """
+    Время последнего изменения новости для If-Modified-Since.
+
+    Страница пользователя содержит форму и ссылки на его комментарии,
+    поэтому ему отдаём только ETag, в котором учтён пользователь.
+    """
+    state = get_news_state(request, pk)
+    if state is None or request.user.is_authenticated:
+        return None
+    published = timezone.make_aware(datetime.combine(state['date'], time.min))
+    return max(
+        moment for moment in (
+            published, state['last_comment'], state['changed_at']
+        )
+        if moment is not None
+    )
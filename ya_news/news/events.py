@@ -0,0 +1,279 @@
+"""
+Поток новых комментариев новости в формате Server-Sent Events.
+
+GET /news/<id>/events/ держит соединение открытым и присылает каждый
+новый комментарий событием comment. Адрес обслуживает ASGI-приложение
+CommentEvents, а не представление: StreamingHttpResponse в Django 3.2
+читает содержимое синхронно и занял бы цикл событий на всё время
+подписки. Подключается в yanews/asgi.py; под WSGI адреса нет.
+
+Подписчики не ходят в базу: комментарий после коммита один раз
+превращается в байты события, и CommentBroadcaster раскладывает их
+по очередям всех подписчиков новости. База читается только при
+подключении — проверить новость и дослать пропущенное после
+Last-Event-ID.
+"""
+import asyncio
+import json
+import re
+import threading
+from collections import defaultdict
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Comment, News
+
+PATH = re.compile(r'^/news/(?P<pk>\d+)/events/$')
+# Пустой комментарий SSE: браузер его пропускает, а прокси
+# не закрывает соединение по простою.
+PING = b': ping\n\n'
+# Подписчик отстал и отключается; браузер переподключится сам
+# и получит пропущенное по Last-Event-ID.
+CLOSE = None
+HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    # nginx иначе копит ответ в буфере и отдаёт события пачками.
+    (b'x-accel-buffering', b'no'),
+]
+
+
+def encode_comment(comment):
+    """Событие SSE для комментария; id события — id комментария."""
+    data = json.dumps({
+        'id': comment.pk,
+        'author': comment.author.username,
+        'created': timezone.localtime(comment.created).isoformat(),
+        'text_html': comment.text_html,
+    }, ensure_ascii=False)
+    return f'id: {comment.pk}\nevent: comment\ndata: {data}\n\n'.encode()
+
+
+class CommentBroadcaster:
+    """
+    Раздача событий подписчикам новостей внутри процесса.
+
+    Очереди подписчиков живут в цикле событий ASGI-сервера и меняются
+    только в нём. publish() можно звать из любого потока: он передаёт
+    событие в цикл одним call_soon_threadsafe, сколько бы ни было
+    подписчиков. Очереди ограничены: кто не успевает читать, того
+    отключаем, а не копим для него события в памяти.
+    """
+
+    def __init__(self, queue_size=None, keepalive=None):
+        self.queue_size = queue_size or settings.COMMENT_EVENTS_QUEUE_SIZE
+        self.keepalive = keepalive or settings.COMMENT_EVENTS_KEEPALIVE
+        self._subscribers = defaultdict(set)
+        self._loop = None
+        self._pinger = None
+
+    def subscribe(self, news_id):
+        """Очередь событий новости; вызывается в цикле событий."""
+        loop = self._loop = asyncio.get_running_loop()
+        pinger = self._pinger
+        if pinger is None or pinger.done() or pinger.get_loop() is not loop:
+            self._pinger = loop.create_task(self._ping())
+        queue = asyncio.Queue(self.queue_size)
+        self._subscribers[news_id].add(queue)
+        return queue
+
+    def unsubscribe(self, news_id, queue):
+        queues = self._subscribers.get(news_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[news_id]
+
+    def has_subscribers(self, news_id):
+        return news_id in self._subscribers
+
+    def count(self):
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(self, news_id, event):
+        """Передаёт событие подписчикам новости из любого потока."""
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self.has_subscribers(
+            news_id
+        ):
+            return
+        loop.call_soon_threadsafe(self._fan_out, news_id, event)
+
+    def _put(self, news_id, queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.unsubscribe(news_id, queue)
+            close(queue)
+
+    def _fan_out(self, news_id, event):
+        for queue in list(self._subscribers.get(news_id, ())):
+            self._put(news_id, queue, event)
+
+    async def _ping(self):
+        """Один таймер на процесс вместо таймера на каждого подписчика."""
+        while self._subscribers:
+            await asyncio.sleep(self.keepalive)
+            for news_id, queues in list(self._subscribers.items()):
+                for queue in list(queues):
+                    self._put(news_id, queue, PING)
+
+
+_lock = threading.Lock()
+_broadcaster = None
+
+
+def get_broadcaster():
+    global _broadcaster
+    if _broadcaster is None:
+        with _lock:
+            if _broadcaster is None:
+                _broadcaster = CommentBroadcaster()
+    return _broadcaster
+
+
+def close(queue):
+    """Заменяет всё, что не успели прочитать, сигналом отключиться."""
+    while not queue.empty():
+        queue.get_nowait()
+    queue.put_nowait(CLOSE)
+
+
+def publish_comment(comment):
+    broadcaster = get_broadcaster()
+    # Без подписчиков событие даже не собирается.
+    if broadcaster.has_subscribers(comment.news_id):
+        broadcaster.publish(comment.news_id, encode_comment(comment))
+
+
+def schedule_comment(comment):
+    """
+    После коммита отправляет новый комментарий подписчикам новости.
+
+    Есть ли подписчики, проверяется уже после коммита: тот, кто
+    подключился, пока шла транзакция, комментарий тоже получит.
+    """
+    transaction.on_commit(lambda: publish_comment(comment))
+
+
+def get_missed_events(news_id, last_id):
+    """
+    События для подключения: None, если новости нет, иначе
+    комментарии после last_id, не больше COMMENT_EVENTS_BACKLOG.
+    """
+    close_old_connections()
+    if not News.objects.filter(pk=news_id).exists():
+        return None
+    if last_id is None:
+        return []
+    comments = Comment.objects.filter(
+        news_id=news_id, pk__gt=last_id
+    ).select_related('author').order_by('-pk')[
+        :settings.COMMENT_EVENTS_BACKLOG
+    ]
+    return [(comment.pk, encode_comment(comment)) for comment in comments][
+        ::-1
+    ]
+
+
+def get_last_event_id(scope):
+    """
+    Последнее полученное событие: заголовок Last-Event-ID, который
+    браузер шлёт при переподключении, или параметр after — id
+    последнего комментария на странице при первом подключении.
+    """
+    value = dict(scope['headers']).get(b'last-event-id')
+    if value is None:
+        value = parse_qs(scope['query_string'].decode()).get('after', [''])[0]
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+async def send_status(send, status):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'text/plain; charset=utf-8')],
+    })
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+class CommentEvents:
+    """
+    ASGI-приложение: события новых комментариев, остальное — в app.
+
+    Подписка оформляется до чтения пропущенного: комментарий,
+    сохранённый между этими шагами, придёт и из базы, и из очереди,
+    и повтор отбрасывается по id.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        match = PATH.match(scope['path']) if scope['type'] == 'http' else None
+        if match is None:
+            return await self.app(scope, receive, send)
+        if scope['method'] != 'GET':
+            return await send_status(send, 405)
+        news_id = int(match['pk'])
+        broadcaster = get_broadcaster()
+        queue = broadcaster.subscribe(news_id)
+        try:
+            missed = await sync_to_async(get_missed_events)(
+                news_id, get_last_event_id(scope)
+            )
+            if missed is None:
+                return await send_status(send, 404)
+            await self.stream(queue, missed, receive, send)
+        finally:
+            broadcaster.unsubscribe(news_id, queue)
+
+    async def stream(self, queue, missed, receive, send):
+        async def wait_for_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            close(queue)
+
+        watcher = asyncio.ensure_future(wait_for_disconnect())
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': HEADERS,
+            })
+            last_id = 0
+            for last_id, event in missed:
+                await send_event(send, event)
+            while True:
+                event = await queue.get()
+                if event is CLOSE:
+                    break
+                # Комментарий уже досылали из базы.
+                if last_id and event is not PING and (
+                    get_event_id(event) <= last_id
+                ):
+                    continue
+                await send_event(send, event)
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            watcher.cancel()
+
+
+def get_event_id(event):
+    return int(event[4:event.index(b'\n')])
+
+
+async def send_event(send, event):
+    await send({
+        'type': 'http.response.body',
+        'body': event,
+        'more_body': True,
+    })
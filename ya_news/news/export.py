@@ -0,0 +1,88 @@
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import ArchivedComment, Comment, News
+
+CHUNK_SIZE = 2000
+FORMATS = ('csv', 'ndjson')
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+# Поля выгрузки; автор подтягивается тем же запросом через JOIN.
+EXPORTS = {
+    'news': (News, ('id', 'title', 'text', 'date', 'comment_count')),
+    'comments': (
+        Comment, ('id', 'news_id', 'author__username', 'text', 'created')
+    ),
+    'archived_comments': (
+        ArchivedComment,
+        ('id', 'news_id', 'author__username', 'text', 'created'),
+    ),
+}
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def get_export_rows(kind, date_from=None, date_to=None, news_id=None):
+    """
+    Заголовок и ленивый поток строк выгрузки.
+
+    Строки читаются кусками по CHUNK_SIZE через iterator(),
+    поэтому память не зависит от размера таблицы.
+    Новости фильтруются по дате публикации, комментарии — по дате создания.
+    """
+    model, fields = EXPORTS[kind]
+    queryset = model.objects.order_by('pk')
+    if model is News:
+        if date_from:
+            queryset = queryset.filter(date__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(date__lte=date_to)
+        if news_id:
+            queryset = queryset.filter(pk=news_id)
+    else:
+        if date_from:
+            queryset = queryset.filter(created__gte=_start_of_day(date_from))
+        if date_to:
+            queryset = queryset.filter(
+                created__lt=_start_of_day(date_to + timedelta(days=1))
+            )
+        if news_id:
+            queryset = queryset.filter(news_id=news_id)
+    rows = queryset.values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+    return fields, rows
+
+
+class Echo:
+    """Файлоподобный объект, который возвращает записанное."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(header, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(header, rows):
+    for row in rows:
+        yield json.dumps(
+            dict(zip(header, row)), cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
+
+
+def iter_export(file_format, header, rows):
+    """Строки выгрузки в нужном формате."""
+    if file_format == 'csv':
+        return iter_csv(header, rows)
+    return iter_ndjson(header, rows)
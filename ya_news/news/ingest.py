@@ -0,0 +1,131 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+# Сколько запрос ждёт коммита своей пачки, в секундах.
+RESULT_TIMEOUT = 10
+
+
+class CommentIngestQueue:
+    """
+    Очередь записи комментариев с одним потоком-писателем.
+
+    Запросы кладут готовые комментарии в очередь и ждут результата,
+    а писатель сохраняет их пачками: по batch_size штук или всё,
+    что накопилось за flush_interval секунд, в одной транзакции.
+    Каждый комментарий пишется в своей точке сохранения, поэтому
+    ошибка в одном не откатывает остальные.
+    """
+
+    def __init__(self, batch_size, flush_interval):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='comment-ingest', daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, comment):
+        """Ставит комментарий в очередь, возвращает Future."""
+        self._start()
+        future = Future()
+        self._queue.put((comment, future))
+        return future
+
+    def save(self, comment):
+        """Сохраняет комментарий и ждёт, пока его пачка закоммитится."""
+        return self.submit(comment).result(timeout=RESULT_TIMEOUT)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            self._flush(self._collect())
+
+    def _flush(self, batch):
+        close_old_connections()
+        errors = {}
+        try:
+            with transaction.atomic():
+                for comment, future in batch:
+                    try:
+                        with transaction.atomic():
+                            comment.save()
+                    except Exception as error:
+                        errors[future] = error
+        except Exception as error:
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        for comment, future in batch:
+            if future in errors:
+                future.set_exception(errors[future])
+            else:
+                future.set_result(comment)
+
+
+_lock = threading.Lock()
+_queue = None
+
+
+def get_ingest_queue():
+    global _queue
+    if _queue is None:
+        with _lock:
+            if _queue is None:
+                _queue = CommentIngestQueue(
+                    settings.COMMENT_INGEST_BATCH_SIZE,
+                    settings.COMMENT_INGEST_FLUSH_MS / 1000,
+                )
+    return _queue
+
+
+def save_comment(comment):
+    """
+    Сохраняет комментарий напрямую или через очередь записи.
+
+    Очередь включается settings.COMMENT_INGEST_QUEUE. Внутри уже
+    открытой транзакции пишем сами: писатель ждал бы её блокировку,
+    а она — писателя.
+
+    Если пачка не закоммитилась за RESULT_TIMEOUT, возвращает None:
+    комментарий остаётся в очереди и, скорее всего, будет сохранён.
+    Ошибкой это не считается, иначе пользователь отправил бы его
+    повторно и получил дубль.
+    """
+    if settings.COMMENT_INGEST_QUEUE and not connection.in_atomic_block:
+        try:
+            return get_ingest_queue().save(comment)
+        except TimeoutError:
+            logger.warning(
+                'Комментарий к новости %s ждёт записи дольше %s с',
+                comment.news_id, RESULT_TIMEOUT,
+            )
+            return None
+    comment.save()
+    return comment
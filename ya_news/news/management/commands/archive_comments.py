@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from news.archive import BATCH_SIZE, archive_old_news
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит комментарии к старым новостям из рабочей таблицы '
+        'в архив.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.COMMENT_ARCHIVE_AFTER_DAYS,
+            help='Возраст новости в днях, после которого ветка уходит '
+                 'в архив.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько комментариев переносить в одной транзакции.',
+        )
+
+    def handle(self, *args, days, batch_size, **options):
+        news, moved = archive_old_news(days, batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'В архиве новостей: {news}, комментариев: {moved}'
+        ))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from news.export import EXPORTS, get_export_rows, iter_export
+from news.forms import ExportForm
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает новости или комментарии в CSV или NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=tuple(EXPORTS))
+        parser.add_argument('--format', dest='file_format', default='csv')
+        parser.add_argument('--date-from')
+        parser.add_argument('--date-to')
+        parser.add_argument('--news', help='id новости.')
+        parser.add_argument(
+            '--output', help='Файл для выгрузки; по умолчанию stdout.'
+        )
+
+    def handle(self, *args, kind, output, **options):
+        form = ExportForm({
+            'format': options['file_format'],
+            'date_from': options['date_from'],
+            'date_to': options['date_to'],
+            'news': options['news'],
+        })
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+        header, rows = get_export_rows(
+            kind,
+            date_from=form.cleaned_data['date_from'],
+            date_to=form.cleaned_data['date_to'],
+            news_id=form.cleaned_data['news'],
+        )
+        lines = iter_export(form.cleaned_data['format'], header, rows)
+        if output is None:
+            self.write_lines(self.stdout, lines)
+            return
+        with open(output, 'w', encoding='utf-8', newline='') as file:
+            self.write_lines(file, lines)
+
+    @staticmethod
+    def write_lines(file, lines):
+        for line in lines:
+            file.write(line)
@@ -0,0 +1,237 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from news.cache import invalidate_home_page, reset_news_total
+from news.models import Comment, News, make_excerpt, render_comment
+from news.trending import rebuild_trending
+
+BATCH_SIZE = 10000
+# Пароль всех сгенерированных пользователей, чтобы под ними входить.
+PASSWORD = 'load-test'
+WORDS = (
+    'город', 'новости', 'жители', 'власти', 'проект', 'улица', 'парк',
+    'школа', 'больница', 'дорога', 'мост', 'выставка', 'концерт',
+    'футбол', 'погода', 'снег', 'дождь', 'лето', 'зима', 'открытие',
+    'ремонт', 'транспорт', 'метро', 'автобус', 'театр', 'музей',
+    'фестиваль', 'рынок', 'цены', 'бюджет', 'решение', 'совет',
+    'район', 'праздник', 'строительство', 'экология', 'река', 'лес',
+    'наука', 'студенты', 'конкурс', 'победа', 'команда', 'заявление',
+)
+# Показатель степени в распределении Ципфа: немногие новости
+# собирают большую часть комментариев.
+ZIPF_EXPONENT = 1.1
+# Сколько секунд после выхода новость собирает комментарии.
+DISCUSSION = 3 * 24 * 3600
+UTC_EPOCH = datetime(1970, 1, 1)
+# Кеш страниц SQLite на время генерации, в килобайтах.
+CACHE_SIZE_KIB = 512 * 1024
+# Тексты берутся из заранее собранного набора: собирать каждый
+# из слов заново дольше, чем вставлять строку.
+TEXT_POOL_SIZE = 10000
+User = get_user_model()
+
+
+def make_text(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words)).capitalize() + '.'
+
+
+def make_pool(rng, min_words, max_words):
+    return [
+        make_text(rng, rng.randint(min_words, max_words))
+        for _ in range(TEXT_POOL_SIZE)
+    ]
+
+
+def popularity(count):
+    """Накопленные веса Ципфа для count новостей."""
+    weights, total = [], 0.0
+    for rank in range(1, count + 1):
+        total += rank ** -ZIPF_EXPONENT
+        weights.append(total)
+    return weights
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует пользователей, новости и комментарии '
+        'для нагрузочного тестирования. Одинаковый --seed '
+        'даёт одинаковые данные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--news', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=1000000)
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=3 * 365,
+            help='За сколько последних дней разбросаны новости.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix',
+            default='load',
+            help='Начало имён пользователей.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько строк вставлять в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.started = time.monotonic()
+        # Даты отсчитываются от полуночи, чтобы при одном seed
+        # данные совпадали в течение дня.
+        self.today = timezone.localdate()
+        if connection.vendor == 'sqlite':
+            # Вставки по индексу (news, created, id) идут вразнобой:
+            # с большим кешем страниц они не упираются в диск.
+            with connection.cursor() as cursor:
+                cursor.execute(f'PRAGMA cache_size = -{CACHE_SIZE_KIB}')
+        user_ids = self.generate_users(options['users'], options['prefix'])
+        news = self.generate_news(options['news'], options['days'])
+        self.generate_comments(options['comments'], news, user_ids)
+        self.log('Пересчитываем счётчики и рейтинг')
+        call_command(
+            'recount_comments', batch_size=self.batch_size, stdout=self.stdout
+        )
+        rebuild_trending()
+        reset_news_total()
+        invalidate_home_page()
+        self.log('Готово')
+
+    def log(self, message):
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(f'[{elapsed:7.1f} с] {message}')
+
+    def insert(self, table, columns, rows):
+        """Вставляет строки пачками, каждая пачка — одна транзакция."""
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            table, ', '.join(columns), ', '.join(['%s'] * len(columns))
+        )
+        batch = []
+        inserted = 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                inserted += self.flush(sql, batch)
+                batch = []
+        inserted += self.flush(sql, batch)
+        return inserted
+
+    def flush(self, sql, batch):
+        if batch:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, batch)
+        return len(batch)
+
+    def generate_users(self, count, prefix):
+        password = make_password(PASSWORD)
+        User.objects.bulk_create(
+            (
+                User(username=f'{prefix}{index}', password=password)
+                for index in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        user_ids = list(
+            User.objects.filter(
+                username__startswith=prefix
+            ).order_by('pk').values_list('pk', flat=True)
+        )
+        self.log(f'Пользователей: {count}')
+        return user_ids
+
+    def generate_news(self, count, days):
+        """Новости со случайными датами; возвращает пары (id, дата)."""
+        last_pk = News.objects.aggregate(last=Max('pk'))['last'] or 0
+        rng = self.rng
+        titles = [title[:50] for title in make_pool(rng, 2, 5)]
+        texts = [
+            (text, make_excerpt(text)) for text in make_pool(rng, 20, 120)
+        ]
+        changed_at = str(timezone.now())
+        rows = (
+            (
+                rng.choice(titles),
+                *rng.choice(texts),
+                str(self.today - timedelta(days=rng.randrange(days))),
+                0,
+                False,
+                changed_at,
+            )
+            for _ in range(count)
+        )
+        self.insert(
+            News._meta.db_table,
+            (
+                'title', 'text', 'excerpt', 'date', 'comment_count',
+                'comments_archived', 'changed_at',
+            ),
+            rows,
+        )
+        news = list(
+            News.objects.filter(pk__gt=last_pk).order_by('pk').values_list(
+                'pk', 'date'
+            )
+        )
+        self.log(f'Новостей: {len(news)}')
+        return news
+
+    def generate_comments(self, count, news, user_ids):
+        """
+        Комментарии распределены по Ципфу: ранг новости случаен,
+        поэтому обсуждаемые новости есть и среди старых, и среди свежих.
+        """
+        if not news or not user_ids:
+            return
+        rng = self.rng
+        tz = timezone.get_current_timezone()
+        # Часовой пояс переводим один раз на новость, а не на комментарий:
+        # дальше работаем с секундами от начала эпохи UTC.
+        ranked = [
+            (pk, int(timezone.make_aware(
+                datetime.combine(date, datetime.min.time()), tz
+            ).timestamp()))
+            for pk, date in news
+        ]
+        rng.shuffle(ranked)
+        weights = popularity(len(ranked))
+        texts = [
+            (text, render_comment(text)) for text in make_pool(rng, 3, 40)
+        ]
+        now = int(timezone.now().timestamp())
+
+        def rows():
+            for _ in range(count):
+                news_id, midnight = rng.choices(ranked, cum_weights=weights)[0]
+                # Обсуждают новость в первые три дня после выхода.
+                created = min(now, midnight + rng.randrange(DISCUSSION))
+                yield (
+                    news_id,
+                    rng.choice(user_ids),
+                    *rng.choice(texts),
+                    # Так SQLite-бэкенд Django хранит время: UTC без зоны.
+                    str(UTC_EPOCH + timedelta(seconds=created)),
+                )
+
+        inserted = self.insert(
+            Comment._meta.db_table,
+            ('news_id', 'author_id', 'text', 'text_html', 'created'),
+            rows(),
+        )
+        self.log(f'Комментариев: {inserted}')
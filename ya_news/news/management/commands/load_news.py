@@ -0,0 +1,185 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from news.cache import invalidate_home_page, reset_news_total
+from news.models import Comment, News
+from news.trending import rebuild_trending
+
+BATCH_SIZE = 5000
+READ_SIZE = 1 << 16
+MODELS = {
+    'news.news': News,
+    'news.comment': Comment,
+}
+User = get_user_model()
+
+
+def iter_ndjson(file):
+    """Записи из файла, где каждая строка — отдельный JSON-объект."""
+    for line in file:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_chunks(file, read_size):
+    while True:
+        chunk = file.read(read_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_json_array(file, read_size=READ_SIZE):
+    """
+    Записи из JSON-массива, который читается кусками.
+
+    В памяти держится только текущий кусок файла,
+    а не весь документ, как у loaddata.
+    """
+    decoder = json.JSONDecoder()
+    chunks = iter_chunks(file, read_size)
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        if buffer.strip():
+            break
+    buffer = buffer.lstrip()
+    if not buffer.startswith('['):
+        raise CommandError('Ожидался JSON-массив объектов.')
+    buffer = buffer[1:]
+    while True:
+        buffer = buffer.lstrip(', \t\r\n')
+        if buffer.startswith(']'):
+            return
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise CommandError('Файл обрывается посреди массива.')
+            buffer += chunk
+            continue
+        buffer = buffer[end:]
+        yield record
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает новости и комментарии из NDJSON '
+        'или JSON-массива в формате фикстур Django.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу с записями.')
+        parser.add_argument(
+            '--format',
+            dest='file_format',
+            choices=('json', 'ndjson'),
+            help='Формат файла; по умолчанию — по расширению.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько записей вставлять в одной транзакции.',
+        )
+
+    def handle(self, *args, path, file_format, batch_size, **options):
+        if file_format is None:
+            is_ndjson = path.endswith(('.ndjson', '.jsonl'))
+            file_format = 'ndjson' if is_ndjson else 'json'
+        self.batch_size = batch_size
+        self.authors = {}
+        self.touched_news = set()
+        self.pending = {News: [], Comment: []}
+        self.loaded = 0
+        self.started = time.monotonic()
+        reader = iter_ndjson if file_format == 'ndjson' else iter_json_array
+        with open(path, encoding='utf-8') as file:
+            for record in reader(file):
+                self.add(record)
+        self.flush()
+        self.repair_counters()
+        rebuild_trending()
+        reset_news_total()
+        invalidate_home_page()
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено записей: {self.loaded} за {self.elapsed:.1f} с'
+        ))
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def add(self, record):
+        try:
+            model = MODELS[record['model']]
+        except KeyError:
+            raise CommandError(f'Неизвестная модель: {record.get("model")}')
+        obj = model(pk=record.get('pk'))
+        for name, value in record['fields'].items():
+            field = model._meta.get_field(name)
+            if field.is_relation:
+                setattr(obj, field.attname, value)
+            else:
+                setattr(obj, field.attname, field.to_python(value))
+        # bulk_create не вызывает save(), считаем сами.
+        obj.fill_derived_fields()
+        self.pending[model].append(obj)
+        if sum(map(len, self.pending.values())) >= self.batch_size:
+            self.flush()
+
+    def resolve_authors(self, comments):
+        """
+        Заменяет натуральные ключи авторов (["username"]) на id.
+
+        Найденные id кешируются, незнакомые имена ищутся
+        одним запросом на пачку.
+        """
+        missing = {
+            comment.author_id[0] for comment in comments
+            if isinstance(comment.author_id, list)
+            and comment.author_id[0] not in self.authors
+        }
+        if missing:
+            self.authors.update(
+                User.objects.filter(
+                    username__in=missing
+                ).values_list('username', 'pk')
+            )
+        for comment in comments:
+            if isinstance(comment.author_id, list):
+                username = comment.author_id[0]
+                if username not in self.authors:
+                    raise CommandError(f'Нет пользователя {username}.')
+                comment.author_id = self.authors[username]
+
+    def flush(self):
+        news, comments = self.pending[News], self.pending[Comment]
+        if not news and not comments:
+            return
+        self.resolve_authors(comments)
+        with transaction.atomic():
+            News.objects.bulk_create(news, batch_size=self.batch_size)
+            Comment.objects.bulk_create(comments, batch_size=self.batch_size)
+        self.touched_news.update(comment.news_id for comment in comments)
+        self.loaded += len(news) + len(comments)
+        self.pending = {News: [], Comment: []}
+        self.stdout.write(
+            f'{self.loaded} записей, '
+            f'{self.loaded / max(self.elapsed, 1e-9):.0f} записей/с'
+        )
+
+    def repair_counters(self):
+        """bulk_create не шлёт сигналы, поэтому счётчики пересчитываем."""
+        touched = sorted(self.touched_news)
+        for start in range(0, len(touched), self.batch_size):
+            with transaction.atomic():
+                News.objects.filter(
+                    pk__in=touched[start:start + self.batch_size]
+                ).recount_comments()
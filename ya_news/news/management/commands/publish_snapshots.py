@@ -0,0 +1,35 @@
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from news.models import News
+from news.snapshots import get_news_paths, publish
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает HTML-снимки главной и всех страниц новостей '
+        'в settings.SNAPSHOT_DIR.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Сначала удалить все старые снимки.',
+        )
+
+    def handle(self, *args, clear, **options):
+        if not settings.SNAPSHOT_DIR:
+            raise CommandError('Не задан settings.SNAPSHOT_DIR.')
+        if clear:
+            shutil.rmtree(settings.SNAPSHOT_DIR, ignore_errors=True)
+        news_ids = News.objects.order_by('pk').values_list('pk', flat=True)
+        published = 0
+        for path in get_news_paths(news_ids):
+            publish(path)
+            published += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Снято страниц: {published}')
+        )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from news.models import DELETE_BATCH_SIZE, News
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет новости вместе с комментариями: комментарии — пачками '
+        'в коротких транзакциях, без загрузки в память.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', type=int, nargs='+', help='id новостей.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DELETE_BATCH_SIZE,
+            help='Сколько комментариев удалять в одной транзакции.',
+        )
+
+    def handle(self, *args, ids, batch_size, **options):
+        deleted = News.objects.filter(pk__in=ids).purge(batch_size)
+        self.stdout.write(self.style.SUCCESS(f'Удалено новостей: {deleted}'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from news.cache import invalidate_home_page
+from news.trending import BATCH_SIZE, rebuild_trending
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг обсуждаемых новостей по комментариям.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько строк читать и вставлять за раз.',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        count = rebuild_trending(batch_size)
+        invalidate_home_page()
+        self.stdout.write(
+            self.style.SUCCESS(f'Новостей в рейтинге: {count}')
+        )
@@ -0,0 +1,56 @@
+import os
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .snapshots import get_snapshot_path
+
+
+class SnapshotMiddleware:
+    """
+    Отдаёт гостям готовые снимки страниц из settings.SNAPSHOT_DIR.
+
+    Снимок отдаётся на GET и HEAD без параметров, если у клиента нет
+    cookie сессии: ни представление, ни ORM не вызываются. Вошедшие
+    пользователи, отправка комментариев и страницы без снимка идут
+    обычным путём. Снимки пишет news.snapshots.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.serve_snapshot(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    def serve_snapshot(self, request):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or request.META.get('QUERY_STRING')
+            or settings.SESSION_COOKIE_NAME in request.COOKIES
+        ):
+            return None
+        target = get_snapshot_path(request.path_info)
+        if target is None:
+            return None
+        try:
+            with target.open('rb') as file:
+                mtime = os.fstat(file.fileno()).st_mtime
+                content = file.read()
+        except FileNotFoundError:
+            return None
+        if not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'), mtime
+        ):
+            return HttpResponseNotModified()
+        # На HEAD тело не отдаём, но длину сообщаем как для GET.
+        response = HttpResponse(b'' if request.method == 'HEAD' else content)
+        response['Content-Length'] = len(content)
+        response['Last-Modified'] = http_date(mtime)
+        # Дальше по цепочке ответ не пойдёт, заголовок ставим сами.
+        response['X-Frame-Options'] = settings.X_FRAME_OPTIONS
+        return response
@@ -0,0 +1,89 @@
+# Generated by Django 3.2.15 on 2026-10-18 20:53
+
+from importlib import import_module
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+BATCH_SIZE = 2000
+# Копия news.models.EXCERPT_WORDS на момент миграции.
+EXCERPT_WORDS = 15
+fts = import_module('news.migrations.0006_news_fts')
+
+
+def restore_fts_triggers(apps, schema_editor):
+    """
+    На SQLite AddField и RemoveField пересоздают news_news, и триггеры
+    поискового индекса удаляются вместе со старой таблицей.
+    Ставим их заново после миграции в обе стороны.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in fts.CREATE_SQL:
+        if 'CREATE TRIGGER' in sql:
+            schema_editor.execute(sql)
+
+
+def backfill(table, source, target, convert):
+    """Заполняет производное поле пачками по BATCH_SIZE строк."""
+
+    def run(apps, schema_editor):
+        connection = schema_editor.connection
+        table_name = connection.ops.quote_name(table)
+        select = (
+            f'SELECT id, {source} FROM {table_name} '
+            'WHERE id > %s ORDER BY id LIMIT %s'
+        )
+        update = f'UPDATE {table_name} SET {target} = %s WHERE id = %s'
+        last_pk = 0
+        with connection.cursor() as cursor:
+            while True:
+                cursor.execute(select, (last_pk, BATCH_SIZE))
+                rows = cursor.fetchall()
+                if not rows:
+                    return
+                last_pk = rows[-1][0]
+                cursor.executemany(
+                    update, [(convert(value), pk) for pk, value in rows]
+                )
+
+    return run
+
+
+def make_excerpt(text):
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+
+def render_comment(text):
+    return str(linebreaksbr(text, autoescape=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0008_comment_verbose_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_fts_triggers),
+        migrations.AddField(
+            model_name='comment',
+            name='text_html',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='excerpt',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(restore_fts_triggers, migrations.RunPython.noop),
+        migrations.RunPython(
+            backfill('news_news', 'text', 'excerpt', make_excerpt),
+            migrations.RunPython.noop,
+        ),
+        migrations.RunPython(
+            backfill('news_comment', 'text', 'text_html', render_comment),
+            migrations.RunPython.noop,
+        ),
+    ]
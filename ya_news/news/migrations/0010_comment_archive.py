@@ -0,0 +1,52 @@
+# Generated by Django 3.2.15 on 2026-10-18 21:12
+
+from importlib import import_module
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+# AddField пересоздаёт news_news, триггеры поиска ставим заново.
+restore_fts_triggers = import_module(
+    'news.migrations.0009_derived_text'
+).restore_fts_triggers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('news', '0009_derived_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_fts_triggers),
+        migrations.AddField(
+            model_name='news',
+            name='comments_archived',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(restore_fts_triggers, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('text', models.TextField()),
+                ('text_html', models.TextField(default='', editable=False)),
+                ('created', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('news', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='news.news')),
+            ],
+            options={
+                'verbose_name': 'Архивный комментарий',
+                'verbose_name_plural': 'Архивные комментарии',
+                'ordering': ('created', 'id'),
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedcomment',
+            index=models.Index(fields=['news', 'created', 'id'], name='archived_news_created_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.15 on 2026-10-18 21:51
+
+from importlib import import_module
+
+from django.db import migrations, models
+import django.utils.timezone
+
+# AddField пересоздаёт news_news, триггеры поиска ставим заново.
+restore_fts_triggers = import_module(
+    'news.migrations.0009_derived_text'
+).restore_fts_triggers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0010_comment_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_fts_triggers),
+        migrations.AddField(
+            model_name='news',
+            name='changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.RunPython(restore_fts_triggers, migrations.RunPython.noop),
+    ]
@@ -2,36 +2,244 @@ from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.template.defaultfilters import linebreaksbr
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from common.deletion import delete_in_batches
+
+# Сколько слов текста новости показывать на главной.
+EXCERPT_WORDS = 15
+# Сколько комментариев удалять в одной транзакции.
+DELETE_BATCH_SIZE = 1000
+
+
+def make_excerpt(text):
+    """Начало текста новости, как его обрезает фильтр truncatewords."""
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+
+def render_comment(text):
+    """Текст комментария в HTML: экранированный, с <br> вместо переводов."""
+    return str(linebreaksbr(text, autoescape=True))
+
+
+def with_derived(update_fields, source, derived):
+    """update_fields, дополненные производным полем, если меняется исходное."""
+    if update_fields is None or source not in update_fields:
+        return update_fields
+    return {*update_fields, derived}
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def touch(self):
+        """Отмечает, что страницы новостей изменились."""
+        return self.update(changed_at=timezone.now())
+
+    def recount_comments(self):
+        """
+        Пересчитывает счётчики комментариев одним UPDATE,
+        считая и архивные, и отмечает, что страницы изменились.
+
+        Возвращает количество обновлённых новостей.
+        """
+        def count(model):
+            return Coalesce(Subquery(
+                model.objects.filter(
+                    news=OuterRef('pk')
+                ).order_by().values('news').annotate(
+                    count=Count('pk')
+                ).values('count')
+            ), 0)
+
+        # Ветка лежит в рабочей таблице или в архиве: считаем обе.
+        return self.update(
+            comment_count=count(Comment) + count(ArchivedComment),
+            changed_at=timezone.now(),
+        )
+
+    def delete(self, batch_size=DELETE_BATCH_SIZE):
+        """
+        Удаляет новости вместе с комментариями, не загружая их.
+
+        Каскад Django сначала читает в память все комментарии, а потом
+        удаляет их в одной долгой транзакции. Здесь комментарии
+        удаляются пачками по batch_size в коротких транзакциях, а сами
+        новости — обычным каскадом, чтобы сработали их сигналы.
+        """
+        news_ids = list(self.values_list('pk', flat=True))
+        Comment.objects.filter(news_id__in=news_ids).delete_in_batches(
+            batch_size
+        )
+        return super().delete()
+
+    def purge(self, batch_size=DELETE_BATCH_SIZE):
+        """То же, что delete(); возвращает число удалённых новостей."""
+        _, deleted = self.delete(batch_size)
+        return deleted.get(self.model._meta.label, 0)
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
+    # Считается из text при сохранении, чтобы не обрезать на каждой странице.
+    excerpt = models.TextField(editable=False, default='')
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+    # Ветка перенесена в ArchivedComment (см. news.archive).
+    comments_archived = models.BooleanField(default=False, editable=False)
+    # Последняя правка новости или её комментариев: по ней считаются
+    # ETag и Last-Modified (см. news.conditional).
+    changed_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            # Главная страница и архив идут от свежих новостей к старым.
+            models.Index(fields=('-date', '-id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
     def __str__(self):
         return self.title
 
+    def fill_derived_fields(self):
+        """Пересчитывает поля, которые хранятся готовыми для страниц."""
+        self.excerpt = make_excerpt(self.text)
+
+    def save(self, *args, update_fields=None, **kwargs):
+        self.fill_derived_fields()
+        self.changed_at = timezone.now()
+        update_fields = with_derived(update_fields, 'text', 'excerpt')
+        if update_fields is not None:
+            update_fields = {*update_fields, 'changed_at'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """Комментарии удаляются пачками до того, как их соберёт каскад."""
+        Comment.objects.filter(news_id=self.pk).delete_in_batches()
+        return super().delete(*args, **kwargs)
+
+
+class CommentQuerySet(models.QuerySet):
 
-class Comment(models.Model):
+    def delete_in_batches(self, batch_size=DELETE_BATCH_SIZE):
+        """
+        Удаляет комментарии пачками в коротких транзакциях без сигналов.
+
+        Возвращает число удалённых и id новостей, к которым они
+        относились: счётчики этих новостей нужно пересчитать.
+        """
+        deleted, rows = delete_in_batches(self, batch_size, 'news_id')
+        return deleted, {news_id for news_id, in rows}
+
+
+class BaseComment(models.Model):
+    """Поля комментария, общие для рабочей таблицы и архива."""
     news = models.ForeignKey(
         News,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        # Поиск по новости покрывает составной индекс ниже.
+        db_index=False,
     )
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
     text = models.TextField()
-    created = models.DateTimeField(auto_now_add=True)
+    # Готовый HTML текста, считается при сохранении.
+    text_html = models.TextField(editable=False, default='')
+    # Не auto_now_add: при массовой загрузке время сохраняется как есть.
+    created = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
-        ordering = ('created',)
+        abstract = True
+        ordering = ('created', 'id')
 
     def __str__(self):
         return self.text[:50]
+
+    def fill_derived_fields(self):
+        """Пересчитывает поля, которые хранятся готовыми для страниц."""
+        self.text_html = render_comment(self.text)
+
+    def save(self, *args, update_fields=None, **kwargs):
+        self.fill_derived_fields()
+        super().save(
+            *args,
+            update_fields=with_derived(update_fields, 'text', 'text_html'),
+            **kwargs,
+        )
+
+
+class Comment(BaseComment):
+    objects = CommentQuerySet.as_manager()
+
+    class Meta(BaseComment.Meta):
+        verbose_name = 'Комментарий'
+        verbose_name_plural = 'Комментарии'
+        indexes = (
+            # Ветка комментариев новости в порядке Meta.ordering.
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_idx',
+            ),
+        )
+
+
+class ArchivedComment(BaseComment):
+    """
+    Комментарий к старой новости, перенесённый из рабочей таблицы.
+
+    Рабочая таблица и её индексы остаются небольшими и помещаются
+    в кеш, а ветки старых новостей читаются отсюда. Переносит
+    news.archive; id остаётся прежним.
+    """
+    # На SQLite integer PRIMARY KEY — это сам rowid, без отдельного индекса.
+    id = models.IntegerField(primary_key=True)
+
+    class Meta(BaseComment.Meta):
+        verbose_name = 'Архивный комментарий'
+        verbose_name_plural = 'Архивные комментарии'
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='archived_news_created_idx',
+            ),
+        )
+
+
+class Trending(models.Model):
+    """
+    Рейтинг обсуждаемости новости.
+
+    Каждый комментарий весит exp(-возраст / τ), поэтому вклад старых
+    со временем затухает. В score хранится логарифм суммы весов,
+    отсчитанных от общей точки news.trending.EPOCH: от текущего
+    момента все оценки отличаются на одну и ту же величину,
+    и сравнивать их можно, не пересчитывая.
+    """
+    news = models.OneToOneField(
+        News,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+    )
+    score = models.FloatField()
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('-score',), name='trending_score_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.news_id}: {self.score:.2f}'
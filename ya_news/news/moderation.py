@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+
+from .cache import invalidate_home_page
+from .models import DELETE_BATCH_SIZE, ArchivedComment, Comment, News
+from .routers import use_primary
+from .snapshots import schedule_news
+from .trending import rebuild_trending
+
+
+def refresh_news(news_ids):
+    """
+    Чинит всё, что выводится из комментариев, после удаления в обход
+    сигналов: счётчики, рейтинг, кеш главной, валидаторы и снимки страниц.
+    """
+    news_ids = sorted(news_ids)
+    if not news_ids:
+        return
+    News.objects.filter(pk__in=news_ids).recount_comments()
+    rebuild_trending(news_ids=news_ids)
+    invalidate_home_page()
+    schedule_news(*news_ids)
+
+
+@use_primary()
+def delete_comments(queryset, batch_size=DELETE_BATCH_SIZE):
+    """
+    Удаляет комментарии и один раз чинит затронутые новости.
+
+    Обычный delete() загружает каждый комментарий и на каждый шлёт
+    сигнал с тремя запросами. Возвращает число удалённых.
+    Всё читается из основной базы: реплика может не знать
+    о свежих комментариях и ещё помнить удалённые.
+    """
+    deleted, news_ids = queryset.delete_in_batches(batch_size)
+    refresh_news(news_ids)
+    return deleted
+
+
+@use_primary()
+def delete_users(queryset, batch_size=DELETE_BATCH_SIZE):
+    """
+    Удаляет пользователей, а их комментарии — пачками, без сигналов,
+    и один раз чинит затронутые новости. Читает, как и
+    delete_comments(), из основной базы.
+
+    Возвращает число удалённых пользователей.
+    """
+    user_ids = list(queryset.values_list('pk', flat=True))
+    _, news_ids = Comment.objects.filter(
+        author_id__in=user_ids
+    ).delete_in_batches(batch_size)
+    # Архивные комментарии удалит каскад одним DELETE: сигналов у них
+    # нет. Их новостям тоже нужно пересчитать счётчики.
+    news_ids.update(
+        ArchivedComment.objects.filter(
+            author_id__in=user_ids
+        ).order_by().values_list('news_id', flat=True).distinct()
+    )
+    get_user_model().objects.filter(pk__in=user_ids).delete()
+    refresh_news(news_ids)
+    return len(user_ids)
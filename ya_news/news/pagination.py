@@ -0,0 +1,208 @@
+import base64
+import binascii
+import json
+from operator import attrgetter
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+NEXT = 'next'
+PREVIOUS = 'prev'
+UP_TO = 'upto'
+DIRECTIONS = (NEXT, PREVIOUS, UP_TO)
+
+
+def dump_cursor(payload):
+    """Упаковывает JSON-совместимые данные в непрозрачный курсор."""
+    return base64.urlsafe_b64encode(
+        json.dumps(payload).encode()
+    ).decode().rstrip('=')
+
+
+def load_cursor(cursor):
+    """Распаковывает курсор; для испорченного бросает ValueError."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError) as error:
+        raise ValueError(cursor) from error
+
+
+class KeysetPage:
+    """Страница объектов и курсоры на соседние страницы."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Постраничный вывод по ключу вместо OFFSET.
+
+    Курсор хранит значения полей сортировки у крайнего объекта страницы,
+    поэтому любая страница выбирается одним запросом по индексу
+    и стоит столько же, сколько первая.
+    Поля сортировки должны однозначно определять объект,
+    последним полем обычно идёт `id`.
+
+    Вместо queryset можно передать список querysets с одними полями
+    сортировки: они листаются как один, страница каждого выбирается
+    своим запросом, и страницы сливаются.
+    """
+
+    def __init__(self, queryset, ordering, per_page, from_end=False):
+        self.querysets = (
+            list(queryset) if isinstance(queryset, (list, tuple))
+            else [queryset]
+        )
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.from_end = from_end
+
+    @property
+    def _fields(self):
+        return [name.lstrip('-') for name in self.ordering]
+
+    def _order_by(self, forward):
+        if forward:
+            return self.ordering
+        return [
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        ]
+
+    def _key(self, obj):
+        return [getattr(obj, name) for name in self._fields]
+
+    @staticmethod
+    def _sort(rows, order_by):
+        """Сортирует объекты так же, как их отсортировала бы база."""
+        for name in reversed(order_by):
+            rows.sort(
+                key=attrgetter(name.lstrip('-')),
+                reverse=name.startswith('-'),
+            )
+
+    def _seek(self, key, forward, inclusive=False):
+        """Условие «объекты после ключа» в выбранном направлении."""
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, key):
+            field = name.lstrip('-')
+            ascending = (name == field) is forward
+            lookup = 'gt' if ascending else 'lt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        if inclusive:
+            condition |= equal
+        return condition
+
+    def encode(self, direction, obj):
+        """Упаковывает направление и ключ объекта в непрозрачный курсор."""
+        return dump_cursor(
+            [direction, [str(value) for value in self._key(obj)]]
+        )
+
+    def decode(self, cursor):
+        """Разбирает курсор, для испорченного курсора отдаёт 404."""
+        try:
+            direction, values = load_cursor(cursor)
+            if direction not in DIRECTIONS:
+                raise ValueError(direction)
+            if len(values) != len(self.ordering):
+                raise ValueError(values)
+            model = self.querysets[0].model
+            key = [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self._fields, values)
+            ]
+        except (ValueError, TypeError, ValidationError):
+            raise Http404('Некорректный курсор.')
+        return direction, key
+
+    def cursor_up_to(self, obj):
+        """Курсор страницы, которая заканчивается на этом объекте."""
+        return self.encode(UP_TO, obj)
+
+    def is_on_last_page(self, obj):
+        """Объект попадает на последнюю страницу (её отдают без курсора)."""
+        seek = self._seek(self._key(obj), forward=True)
+        if len(self.querysets) == 1:
+            return not self.querysets[0].filter(seek)[
+                self.per_page - 1:self.per_page
+            ].exists()
+        newer = sum(
+            queryset.filter(seek)[:self.per_page].count()
+            for queryset in self.querysets
+        )
+        return newer < self.per_page
+
+    def _fetch(self, key, forward, inclusive=False):
+        order_by = self._order_by(forward)
+        rows = []
+        for queryset in self.querysets:
+            if key is not None:
+                queryset = queryset.filter(
+                    self._seek(key, forward, inclusive)
+                )
+            rows += queryset.order_by(*order_by)[:self.per_page + 1]
+        if len(self.querysets) > 1:
+            self._sort(rows, order_by)
+        return rows[:self.per_page], len(rows) > self.per_page
+
+    def page(self, cursor=None):
+        """Возвращает страницу, на которую указывает курсор."""
+        if cursor:
+            direction, key = self.decode(cursor)
+        else:
+            direction, key = (PREVIOUS if self.from_end else NEXT), None
+        if direction == NEXT:
+            rows, has_more = self._fetch(key, forward=True)
+            if not rows:
+                return KeysetPage([])
+            return KeysetPage(
+                rows,
+                next_cursor=self.encode(NEXT, rows[-1]) if has_more else None,
+                previous_cursor=(
+                    self.encode(PREVIOUS, rows[0]) if key is not None
+                    else None
+                ),
+            )
+        rows, has_more = self._fetch(
+            key, forward=False, inclusive=direction == UP_TO
+        )
+        rows.reverse()
+        if not rows:
+            return KeysetPage([])
+        if direction == UP_TO:
+            seek = self._seek(self._key(rows[-1]), forward=True)
+            has_newer = any(
+                queryset.filter(seek).exists()
+                for queryset in self.querysets
+            )
+        else:
+            has_newer = key is not None
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode(NEXT, rows[-1]) if has_newer else None,
+            previous_cursor=(
+                self.encode(PREVIOUS, rows[0]) if has_more else None
+            ),
+        )
@@ -0,0 +1,148 @@
+import logging
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Похожие латинские буквы и цифры, которыми маскируют слова.
+SUBSTITUTIONS = str.maketrans({
+    'ё': 'е',
+    'a': 'а',
+    'b': 'в',
+    'c': 'с',
+    'e': 'е',
+    'h': 'н',
+    'k': 'к',
+    'm': 'м',
+    'o': 'о',
+    'p': 'р',
+    't': 'т',
+    'x': 'х',
+    'y': 'у',
+    'u': 'и',
+    '@': 'а',
+    '0': 'о',
+    '3': 'з',
+    '4': 'ч',
+    '6': 'б',
+})
+
+
+def normalize(text):
+    """Приводит текст к одному виду: нижний регистр, «е» вместо «ё»."""
+    return text.lower().translate(SUBSTITUTIONS)
+
+
+class ProfanityMatcher:
+    """
+    Автомат Ахо — Корасик по списку запрещённых слов.
+
+    Строится один раз, а текст проверяет за один проход
+    независимо от длины списка.
+    """
+
+    def __init__(self, words):
+        self._goto = [{}]
+        self._fail = [0]
+        self._terminal = [False]
+        for word in words:
+            word = normalize(word.strip())
+            if word:
+                self._add(word)
+        self._link()
+
+    def _add(self, word):
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._terminal.append(False)
+                self._goto[state][char] = next_state
+            state = next_state
+        self._terminal[state] = True
+
+    def _link(self):
+        """Строит суффиксные ссылки обходом в ширину."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                if self._terminal[self._fail[next_state]]:
+                    self._terminal[next_state] = True
+
+    def search(self, text):
+        """Есть ли в тексте хотя бы одно слово из списка."""
+        goto, fail, terminal = self._goto, self._fail, self._terminal
+        state = 0
+        for char in normalize(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if terminal[state]:
+                return True
+        return False
+
+
+def read_words(path):
+    """Слова из файла: по одному на строке, строки с # пропускаются."""
+    with open(path, encoding='utf-8') as file:
+        return [
+            line.strip() for line in file
+            if line.strip() and not line.startswith('#')
+        ]
+
+
+_lock = threading.Lock()
+_matcher = None
+_source = None
+
+
+def _is_stale(source):
+    return _matcher is None or (source is not _source and source != _source)
+
+
+def get_matcher(default_words=()):
+    """
+    Автомат для текущего списка слов.
+
+    Если задан settings.BAD_WORDS_FILE, список читается из файла
+    и перестраивается, как только у файла меняется время изменения.
+    Иначе, а также если файла нет, используется список default_words:
+    комментарии проверяются хотя бы по нему, а не падают с ошибкой.
+    """
+    global _matcher, _source
+    path = getattr(settings, 'BAD_WORDS_FILE', None)
+    source, missing = default_words, None
+    if path:
+        try:
+            source = (os.fspath(path), os.stat(path).st_mtime_ns)
+        except OSError as error:
+            # Свой источник, чтобы перейти на запасной список и сообщить
+            # об этом один раз, а не на каждый комментарий.
+            source, missing = (os.fspath(path), None), error
+    if _is_stale(source):
+        with _lock:
+            if _is_stale(source):
+                if missing is not None:
+                    logger.error(
+                        'Не удалось прочитать BAD_WORDS_FILE, проверяем '
+                        'по встроенному списку: %s', missing,
+                    )
+                if path and missing is None:
+                    words = read_words(path)
+                else:
+                    words = default_words
+                _matcher = ProfanityMatcher(words)
+                _source = source
+    return _matcher
@@ -1,6 +1,7 @@
 import pytest
 from datetime import timedelta
 
+from django.core.cache import cache
 from django.test.client import Client
 from django.utils import timezone
 
@@ -96,3 +97,8 @@ def form_data_new():
 @pytest.fixture(autouse=True)
 def enable_db_access_for_all_tests(db):
     pass
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
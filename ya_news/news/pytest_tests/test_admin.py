@@ -0,0 +1,206 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from news.admin import CommentAuthorAdmin
+from news.models import Comment, News, NewsQuerySet, Trending
+from news.moderation import delete_users
+
+User = get_user_model()
+
+
+@pytest.fixture
+def spam(news, author):
+    return [
+        Comment.objects.create(news=news, author=author, text=f'Спам {index}')
+        for index in range(30)
+    ]
+
+
+def test_news_change_page_shows_only_latest_comments(
+    admin_client, news, more_comments, settings, django_assert_max_num_queries
+):
+    settings.COMMENTS_COUNT_IN_ADMIN_INLINE = 3
+    url = reverse('admin:news_news_change', args=(news.pk,))
+    with django_assert_max_num_queries(20):
+        response = admin_client.get(url)
+    formset = response.context['inline_admin_formsets'][0].formset
+    latest = Comment.objects.filter(news=news).order_by('-created', '-id')
+    assert [form.instance for form in formset.initial_forms] == list(
+        latest[:3]
+    )
+    changelist = reverse('admin:news_comment_changelist')
+    link = f'{changelist}?news__id__exact={news.pk}'
+    assert link in response.content.decode()
+
+
+def test_inline_edit_survives_new_comments(
+    admin_client, news, author, more_comments, now, settings
+):
+    settings.COMMENTS_COUNT_IN_ADMIN_INLINE = 3
+    url = reverse('admin:news_news_change', args=(news.pk,))
+    response = admin_client.get(url)
+    formset = response.context['inline_admin_formsets'][0].formset
+    news.refresh_from_db()
+    data = {
+        'title': news.title,
+        'text': news.text,
+        'date': news.date.isoformat(),
+        **{
+            formset.management_form.add_prefix(name): value
+            for name, value in formset.management_form.initial.items()
+        },
+    }
+    for form in formset.initial_forms:
+        data[form.add_prefix('id')] = form.instance.pk
+        for name in ('news', 'author', 'text'):
+            data[form.add_prefix(name)] = form.initial[name]
+    oldest = formset.initial_forms[-1]
+    data[oldest.add_prefix('text')] = 'Правка модератора'
+    # Пока модератор правил, пришёл новый комментарий: срез последних
+    # сдвинулся, но правка должна попасть в тот комментарий, что он видел.
+    Comment.objects.create(
+        news=news, author=author, text='Свежий',
+        created=now + timedelta(days=100),
+    )
+    response = admin_client.post(url, data)
+    assert response.status_code == 302
+    oldest.instance.refresh_from_db()
+    assert oldest.instance.text == 'Правка модератора'
+
+
+def test_news_changelist_uses_stored_counts(
+    admin_client, more_news, news, more_comments, django_assert_num_queries
+):
+    url = reverse('admin:news_news_changelist')
+    admin_client.get(url)
+    # Сессия, пользователь, число новостей и сама страница.
+    with django_assert_num_queries(4):
+        response = admin_client.get(url)
+    assert '>10<' in response.content.decode()
+
+
+def test_spam_is_deleted_without_per_comment_queries(
+    admin_client, news, comment, spam, django_assert_max_num_queries
+):
+    url = reverse('admin:news_comment_changelist')
+    data = {
+        'action': 'delete_spam',
+        '_selected_action': [item.pk for item in spam],
+    }
+    # Число запросов не зависит от числа удаляемых комментариев.
+    with django_assert_max_num_queries(15):
+        admin_client.post(url, data)
+    assert list(Comment.objects.all()) == [comment]
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    assert Trending.objects.filter(news=news).exists()
+
+
+def test_news_with_comments_is_deleted_in_bulk(
+    admin_client, news, spam, django_assert_max_num_queries
+):
+    url = reverse('admin:news_news_delete', args=(news.pk,))
+    response = admin_client.get(url)
+    assert 'комментариев: 30' in response.content.decode()
+    with django_assert_max_num_queries(20):
+        admin_client.post(url, {'post': 'yes'})
+    assert not News.objects.exists()
+    assert not Comment.objects.exists()
+
+
+def test_purge_deletes_comments_in_batches_without_loading_them(
+    news, spam, monkeypatch, django_assert_max_num_queries
+):
+    loaded = []
+    from_db = Comment.from_db.__func__
+    monkeypatch.setattr(Comment, 'from_db', classmethod(
+        lambda cls, *args: loaded.append(args) or from_db(cls, *args)
+    ))
+    # Пачки по 7: пять выборок id и четыре DELETE в своих транзакциях.
+    with django_assert_max_num_queries(30):
+        assert News.objects.filter(pk=news.pk).purge(batch_size=7) == 1
+    assert loaded == []
+    assert not News.objects.exists()
+    assert not Comment.objects.exists()
+    assert not Trending.objects.exists()
+
+
+def test_news_queryset_delete_does_not_load_comments(
+    news, spam, monkeypatch
+):
+    loaded = []
+    from_db = Comment.from_db.__func__
+    monkeypatch.setattr(Comment, 'from_db', classmethod(
+        lambda cls, *args: loaded.append(args) or from_db(cls, *args)
+    ))
+    News.objects.filter(pk=news.pk).delete()
+    assert loaded == []
+    assert not News.objects.exists()
+    assert not Comment.objects.exists()
+
+
+def test_news_delete_uses_batches(news, spam, django_assert_max_num_queries):
+    with django_assert_max_num_queries(15):
+        news.delete()
+    assert not Comment.objects.exists()
+
+
+def test_user_is_deleted_with_comments_in_bulk(
+    admin_client, author, news, spam, not_author,
+    django_assert_max_num_queries
+):
+    kept = Comment.objects.create(news=news, author=not_author, text='Своё')
+    url = reverse('admin:auth_user_delete', args=(author.pk,))
+    response = admin_client.get(url)
+    assert 'комментариев: 30' in response.content.decode()
+    with django_assert_max_num_queries(30):
+        admin_client.post(url, {'post': 'yes'})
+    assert list(Comment.objects.all()) == [kept]
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('model', (News, User))
+def test_admin_delete_runs_outside_transaction(
+    admin_client, news, author, spam, model, monkeypatch
+):
+    # Пачки комментариев коммитятся сами, а не одной транзакцией.
+    in_atomic_block = []
+
+    def record(delete):
+        def wrapper(*args, **kwargs):
+            in_atomic_block.append(connection.in_atomic_block)
+            return delete(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(
+        NewsQuerySet, 'purge', record(NewsQuerySet.purge)
+    )
+    monkeypatch.setattr(
+        CommentAuthorAdmin, 'delete_users', staticmethod(record(delete_users))
+    )
+    obj = news if model is News else author
+    opts = model._meta
+    url = reverse(
+        f'admin:{opts.app_label}_{opts.model_name}_delete', args=(obj.pk,)
+    )
+    admin_client.post(url, {'post': 'yes'})
+    assert in_atomic_block == [False]
+    assert not Comment.objects.exists()
+
+
+def test_purge_commands(news, spam, author, not_author):
+    other = News.objects.create(title='Другая', text='Текст')
+    Comment.objects.create(news=other, author=not_author, text='Своё')
+    call_command('purge_users', author.username, stdout=StringIO())
+    assert not Comment.objects.filter(news=news).exists()
+    call_command('purge_news', str(other.pk), news.pk, stdout=StringIO())
+    assert not News.objects.exists()
+    assert not Comment.objects.exists()
@@ -0,0 +1,189 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from news.archive import iter_batches
+from news.models import ArchivedComment, Comment, News
+from news.pytest_tests.test_query_plans import full_scans
+
+
+@pytest.fixture
+def old_news(news, more_comments, settings):
+    News.objects.filter(pk=news.pk).update(
+        date=timezone.localdate() - timedelta(
+            days=settings.COMMENT_ARCHIVE_AFTER_DAYS + 1
+        )
+    )
+    return news
+
+
+@pytest.fixture
+def archived(old_news):
+    call_command('archive_comments', stdout=StringIO())
+    old_news.refresh_from_db()
+    return old_news
+
+
+@pytest.fixture
+def fresh_news(author):
+    news = News.objects.create(title='Свежая', text='Текст')
+    Comment.objects.create(news=news, author=author, text='Горячий')
+    return news
+
+
+def test_old_threads_are_moved_to_archive(archived, fresh_news):
+    assert archived.comments_archived
+    assert archived.comment_count == 10
+    assert ArchivedComment.objects.filter(news=archived).count() == 10
+    assert list(Comment.objects.values_list('news', flat=True)) == [
+        fresh_news.pk
+    ]
+
+
+def test_detail_page_reads_archive_transparently(client, old_news):
+    url = reverse('news:detail', args=(old_news.pk,))
+    before = client.get(url).content
+    call_command('archive_comments', stdout=StringIO())
+    with CaptureQueriesContext(connection) as queries:
+        after = client.get(url).content
+    assert after == before
+    sql = ' '.join(query['sql'] for query in queries)
+    assert '"news_archivedcomment"."text_html"' in sql
+
+
+def test_comment_saved_past_archive_is_shown(client, archived, author):
+    # Новые комментарии к архивной новости пишутся в рабочую таблицу.
+    comment = Comment.objects.create(
+        news=archived, author=author, text='Мимо архива'
+    )
+    response = client.get(reverse('news:detail', args=(archived.pk,)))
+    assert comment in response.context['comments']
+    assert 'Мимо архива' in response.content.decode()
+
+
+def test_archived_thread_pages_merge_both_tables(
+    client, archived, author, now, settings
+):
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 4
+    comment = Comment.objects.create(
+        news=archived, author=author, text='Мимо архива'
+    )
+    Comment.objects.filter(pk=comment.pk).update(
+        created=now + timedelta(days=4, hours=12)
+    )
+    url = reverse('news:detail', args=(archived.pk,))
+    shown, cursor = [], None
+    while True:
+        response = client.get(url, {'cursor': cursor} if cursor else None)
+        page = response.context['comments']
+        assert len(page) == (4 if page.has_previous else 3)
+        shown = [item.created for item in page] + shown
+        if not page.has_previous:
+            break
+        cursor = page.previous_cursor
+    assert len(shown) == 11
+    assert shown == sorted(shown)
+
+
+def test_archiving_sweeps_comments_of_archived_news(archived, author):
+    Comment.objects.create(news=archived, author=author, text='Мимо архива')
+    call_command('archive_comments', stdout=StringIO())
+    assert not Comment.objects.exists()
+    assert ArchivedComment.objects.filter(news=archived).count() == 11
+
+
+def test_archived_thread_uses_index(client, archived):
+    url = reverse('news:detail', args=(archived.pk,))
+    assert full_scans(client, url) == []
+
+
+def test_new_comment_on_archived_news_stays_in_hot_table(
+    author_client, archived, form_data_old, settings
+):
+    settings.QUERY_BUDGET_ACTION = 'raise'
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 4
+    url = reverse('news:detail', args=(archived.pk,))
+    response = author_client.post(url, data=form_data_old)
+    comment = Comment.objects.get()
+    # Курсор считается по обеим таблицам: комментарий не на последней
+    # странице ветки, хотя в рабочей таблице он один.
+    assert 'cursor=' in response.url
+    assert comment in author_client.get(response.url).context['comments']
+    archived.refresh_from_db()
+    assert archived.comments_archived
+    assert archived.comment_count == 11
+    assert ArchivedComment.objects.filter(news=archived).count() == 10
+
+
+def test_archived_comment_is_edited_in_archive(
+    author_client, archived, form_data_new, settings
+):
+    settings.QUERY_BUDGET_ACTION = 'raise'
+    pk = ArchivedComment.objects.filter(news=archived).first().pk
+    response = author_client.post(
+        reverse('news:edit', args=(pk,)), data=form_data_new
+    )
+    assert response.status_code == 302
+    comment = ArchivedComment.objects.get(pk=pk)
+    assert comment.text == form_data_new['text']
+    assert comment.text_html == form_data_new['text']
+    assert not Comment.objects.exists()
+
+
+def test_archived_comment_is_deleted_from_archive(
+    author_client, archived, settings
+):
+    settings.QUERY_BUDGET_ACTION = 'raise'
+    pk = ArchivedComment.objects.filter(news=archived).first().pk
+    response = author_client.post(reverse('news:delete', args=(pk,)))
+    assert response.status_code == 302
+    assert not ArchivedComment.objects.filter(pk=pk).exists()
+    assert not Comment.objects.exists()
+    archived.refresh_from_db()
+    assert archived.comments_archived
+    assert archived.comment_count == 9
+
+
+@pytest.mark.parametrize('name', ('news:edit', 'news:delete'))
+def test_archived_comment_page_reads_archive(
+    author_client, archived, name
+):
+    comment = ArchivedComment.objects.filter(news=archived).first()
+    response = author_client.get(reverse(name, args=(comment.pk,)))
+    assert response.status_code == 200
+    assert response.context['comment'] == comment
+    archived.refresh_from_db()
+    assert archived.comments_archived
+    assert not Comment.objects.exists()
+
+
+def test_archived_comment_of_other_user_is_not_found(
+    not_author_client, archived
+):
+    pk = ArchivedComment.objects.filter(news=archived).first().pk
+    response = not_author_client.get(reverse('news:edit', args=(pk,)))
+    assert response.status_code == 404
+
+
+def test_recount_includes_archived_comments(archived):
+    News.objects.update(comment_count=0)
+    call_command('recount_comments', stdout=StringIO())
+    archived.refresh_from_db()
+    assert archived.comment_count == 10
+
+
+def test_deleting_author_fixes_archived_counts(archived, author):
+    call_command('purge_users', author.username, stdout=StringIO())
+    assert not ArchivedComment.objects.exists()
+    assert News.objects.get().comment_count == 0
+
+
+def test_batches_limit_comments_per_transaction():
+    news = [(1, 5), (2, 5), (3, 20), (4, 0), (5, 1)]
+    assert list(iter_batches(news, 10)) == [[1, 2], [3], [4, 5]]
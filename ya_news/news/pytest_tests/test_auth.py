@@ -0,0 +1,71 @@
+import pytest
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+
+from yanews import settings_production
+
+PASSWORD = 'Пароль123'
+
+
+@pytest.fixture
+def production_sessions(settings):
+    settings.SESSION_ENGINE = settings_production.SESSION_ENGINE
+    settings.MIDDLEWARE = settings_production.MIDDLEWARE
+
+
+@pytest.fixture
+def reader_client(django_user_model, production_sessions):
+    django_user_model.objects.create_user(username='reader', password=PASSWORD)
+    client = Client()
+    client.login(username='reader', password=PASSWORD)
+    return client
+
+
+def tables(queries):
+    """Запросы за сессией или пользователем, а не JOIN авторов."""
+    return {
+        table for query in queries
+        for table in ('django_session', 'auth_user')
+        if f'FROM "{table}"' in query['sql']
+    }
+
+
+@pytest.mark.parametrize('name', ('news:home', 'news:detail'))
+def test_anonymous_pages_do_not_touch_sessions(client, news, name):
+    args = (news.id,) if name == 'news:detail' else ()
+    with CaptureQueriesContext(connection) as queries:
+        client.get(reverse(name, args=args))
+    assert not tables(queries)
+
+
+def test_logged_in_user_is_read_from_process_cache(reader_client, news):
+    url = reverse('news:detail', args=(news.id,))
+    reader_client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = reader_client.get(url)
+    assert response.context['user'].username == 'reader'
+    assert not tables(queries)
+
+
+def test_password_change_ends_cached_sessions(
+    reader_client, django_user_model, news
+):
+    url = reverse('news:detail', args=(news.id,))
+    reader_client.get(url)
+    reader = django_user_model.objects.get(username='reader')
+    reader.set_password('Новый пароль')
+    reader.save()
+    response = reader_client.get(url)
+    assert not response.context['user'].is_authenticated
+
+
+def test_cached_user_expires(reader_client, django_user_model, news, settings):
+    settings.AUTH_USER_CACHE_TIMEOUT = 0
+    url = reverse('news:detail', args=(news.id,))
+    reader_client.get(url)
+    # Пароль сменили в другом процессе, здесь сигнал не пришёл.
+    django_user_model.objects.filter(username='reader').update(password='')
+    response = reader_client.get(url)
+    assert not response.context['user'].is_authenticated
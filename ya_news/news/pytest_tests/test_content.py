@@ -1,9 +1,12 @@
 import pytest
+from http import HTTPStatus
 
+from django.core.cache import cache
 from django.urls import reverse
 
 from django.conf import settings
 from news.forms import CommentForm
+from news.models import Comment, News
 
 
 def test_news_count(client, more_news):
@@ -43,3 +46,226 @@ def test_clients_has_form(news, parametrized_client, expected_result):
     assert ('form' in response.context) is expected_result
     if expected_result:
         assert isinstance(response.context['form'], CommentForm)
+
+
+def test_home_page_comment_count_without_loading_comments(
+    client, news, more_comments, django_assert_num_queries
+):
+    # Список новостей и рейтинг обсуждаемых.
+    with django_assert_num_queries(2):
+        response = client.get(reverse('news:home'))
+    assert 'Комментариев: 10' in response.content.decode()
+
+
+def test_home_page_shows_stored_excerpt_without_full_text(
+    client, django_assert_num_queries
+):
+    for title in ('Длинная', 'Ещё длиннее', 'Самая длинная'):
+        News.objects.create(title=title, text=' '.join(['слово'] * 40))
+    # Отложенный text не дочитывается по новости: запросов столько же,
+    # сколько для одной.
+    with django_assert_num_queries(2):
+        response = client.get(reverse('news:home'))
+    news = response.context['object_list'][0]
+    assert 'text' in news.get_deferred_fields()
+    assert ' '.join(['слово'] * 15) + ' …' in response.content.decode()
+
+
+def test_detail_page_shows_escaped_comment_html(client, news, author):
+    Comment.objects.create(
+        news=news, author=author, text='<script>\nвторая строка'
+    )
+    response = client.get(reverse('news:detail', args=(news.id,)))
+    assert '&lt;script&gt;<br>вторая строка' in response.content.decode()
+
+
+def test_home_page_shows_trending_news(client, news, more_news, author):
+    Comment.objects.create(news=news, author=author, text='Обсуждаем')
+    content = client.get(reverse('news:home')).content.decode()
+    assert 'Самые обсуждаемые' in content
+    trending = content.split('<ol>')[1].split('</ol>')[0]
+    assert news.title in trending
+    assert len(trending.split('<li>')) == 2
+
+
+def test_comments_are_paginated_by_cursor(
+    client, news, more_comments, settings
+):
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 3
+    url = reverse('news:detail', args=(news.id,))
+    response = client.get(url)
+    page = response.context['comments']
+    assert not page.has_next
+    seen = []
+    while True:
+        seen = [comment.id for comment in page] + seen
+        assert len(page) <= settings.COMMENTS_COUNT_ON_DETAIL_PAGE
+        if not page.has_previous:
+            break
+        response = client.get(url, {'cursor': page.previous_cursor})
+        page = response.context['comments']
+    expected = list(
+        Comment.objects.filter(news=news).values_list('id', flat=True)
+    )
+    assert seen == expected
+    response = client.get(url, {'cursor': page.next_cursor})
+    assert response.context['comments'].has_previous
+
+
+def test_broken_cursor_gives_not_found(client, news):
+    url = reverse('news:detail', args=(news.id,))
+    response = client.get(url, {'cursor': 'not-a-cursor'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_archive_reaches_all_news(client, more_news, settings):
+    settings.NEWS_COUNT_ON_ARCHIVE_PAGE = 4
+    url = reverse('news:archive')
+    response = client.get(url)
+    assert response.context['news_total'] == len(more_news)
+    seen = []
+    while True:
+        page = response.context['page']
+        seen += [news.date for news in page]
+        if not page.has_next:
+            break
+        response = client.get(url, {'cursor': page.next_cursor})
+    assert len(seen) == len(more_news)
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_archive_page_does_not_count_news(
+    client, more_news, django_assert_num_queries
+):
+    url = reverse('news:archive')
+    client.get(url)
+    with django_assert_num_queries(1):
+        client.get(url)
+
+
+def test_home_page_is_served_from_cache(
+    client, author_client, author, more_news, django_assert_num_queries
+):
+    url = reverse('news:home')
+    client.get(url)
+    with django_assert_num_queries(0):
+        response = client.get(url)
+    content = response.content.decode()
+    detail_url = reverse('news:detail', args=(News.objects.first().id,))
+    assert f'<h3><a href="{detail_url}">' in content
+    response = author_client.get(url)
+    assert author.username in response.content.decode()
+    assert author.username not in content
+
+
+def test_home_page_cache_is_invalidated(client, news, author):
+    url = reverse('news:home')
+    client.get(url)
+    Comment.objects.create(news=news, author=author, text='Новый')
+    assert 'Комментариев: 1' in client.get(url).content.decode()
+    news.delete()
+    assert news.title not in client.get(url).content.decode()
+
+
+def test_unchanged_detail_page_answers_not_modified(
+    client, news, comment, django_assert_num_queries
+):
+    url = reverse('news:detail', args=(news.id,))
+    response = client.get(url)
+    etag = response['ETag']
+    with django_assert_num_queries(1):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    response = client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_detail_page_validator_changes_with_thread(
+    client, author_client, news, comment, form_data_new
+):
+    url = reverse('news:detail', args=(news.id,))
+    etag = client.get(url)['ETag']
+    assert author_client.get(url)['ETag'] != etag
+    author_client.post(
+        reverse('news:edit', args=(comment.id,)), data=form_data_new
+    )
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_detail_page_validators_do_not_depend_on_cache(
+    client, news, comment
+):
+    url = reverse('news:detail', args=(news.id,))
+    etag = client.get(url)['ETag']
+    # Кеш у каждого процесса свой: метка правки живёт в строке новости.
+    cache.clear()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    comment.text = 'Правка'
+    comment.save()
+    cache.clear()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_detail_page_etag_changes_with_session_and_csrf_token(
+    author_client, author, news
+):
+    url = reverse('news:detail', args=(news.id,))
+    etag = author_client.get(url)['ETag']
+    author_client.cookies[settings.CSRF_COOKIE_NAME] = 'x' * 64
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    etag = response['ETag']
+    author_client.logout()
+    author_client.force_login(author)
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.fixture
+def search_news_items():
+    return [
+        News.objects.create(title='Робот ищет ключи', text='Под фонарём.'),
+        News.objects.create(title='Обмен снами', text='Робот не нужен.'),
+        News.objects.create(title='Приз за рекурсию', text='Коробки.'),
+    ]
+
+
+def test_search_ranks_and_highlights(client, search_news_items):
+    response = client.get(reverse('news:search'), {'q': 'робот'})
+    results = response.context['results']
+    assert [result.pk for result in results] == [
+        search_news_items[0].pk, search_news_items[1].pk
+    ]
+    assert '<mark>Робот</mark>' in results[1].snippet
+
+
+def test_search_index_follows_changes(client, search_news_items):
+    news = search_news_items[2]
+    news.title = 'Робот и рекурсия'
+    news.save()
+    search_news_items[0].delete()
+    response = client.get(reverse('news:search'), {'q': 'робот'})
+    found = {result.pk for result in response.context['results']}
+    assert found == {news.pk, search_news_items[1].pk}
+
+
+def test_search_pages_by_cursor(client, settings):
+    settings.NEWS_COUNT_ON_SEARCH_PAGE = 2
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Общее слово')
+        for index in range(5)
+    )
+    url = reverse('news:search')
+    response = client.get(url, {'q': 'общее'})
+    seen = [result.pk for result in response.context['results']]
+    while response.context['next_cursor']:
+        response = client.get(
+            url, {'q': 'общее', 'cursor': response.context['next_cursor']}
+        )
+        seen += [result.pk for result in response.context['results']]
+    assert sorted(seen) == sorted(News.objects.values_list('pk', flat=True))
@@ -0,0 +1,146 @@
+import asyncio
+import json
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+import pytest
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.test import AsyncClient
+from django.urls import reverse
+
+from news.events import CLOSE, CommentBroadcaster, CommentEvents
+from news.models import Comment
+from yanews.asgi import application
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def events_scope(news_id, method='GET', headers=()):
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': f'/news/{news_id}/events/',
+        'query_string': b'',
+        'headers': list(headers),
+    }
+
+
+def parse_event(message):
+    fields = dict(
+        line.split(': ', 1)
+        for line in message['body'].decode().splitlines() if line
+    )
+    return fields['event'], json.loads(fields['data'])
+
+
+async def disconnect(events):
+    await events.send_input({'type': 'http.disconnect'})
+    end = await events.receive_output(1)
+    await events.wait(1)
+    return end
+
+
+def test_new_comment_is_streamed_to_subscriber(author, news, form_data_old):
+    client = AsyncClient()
+    client.force_login(author)
+    url = reverse('news:detail', args=(news.pk,))
+
+    async def scenario():
+        events = ApplicationCommunicator(application, events_scope(news.pk))
+        await events.send_input({'type': 'http.request'})
+        start = await events.receive_output(1)
+        # Multipart AsyncClient в Django 3.2 читает лишнее из тела.
+        response = await client.post(
+            url,
+            urlencode(form_data_old),
+            content_type='application/x-www-form-urlencoded',
+        )
+        message = await events.receive_output(1)
+        return start, response, message, await disconnect(events)
+
+    start, response, message, end = async_to_sync(scenario)()
+    assert start['status'] == HTTPStatus.OK
+    assert (b'content-type', b'text/event-stream; charset=utf-8') in (
+        start['headers']
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    event, data = parse_event(message)
+    comment = Comment.objects.get()
+    assert event == 'comment'
+    assert data['id'] == comment.pk
+    assert data['author'] == author.username
+    assert data['text_html'] == comment.text_html
+    assert end == {'type': 'http.response.body', 'body': b''}
+
+
+def test_missed_comments_are_sent_after_last_event_id(author, news):
+    first, *missed = [
+        Comment.objects.create(news=news, author=author, text=str(index))
+        for index in range(3)
+    ]
+    scope = events_scope(
+        news.pk, headers=[(b'last-event-id', str(first.pk).encode())]
+    )
+
+    async def scenario():
+        events = ApplicationCommunicator(application, scope)
+        await events.send_input({'type': 'http.request'})
+        await events.receive_output(1)
+        messages = [await events.receive_output(1) for _ in missed]
+        await disconnect(events)
+        assert await events.receive_nothing()
+        return messages
+
+    messages = async_to_sync(scenario)()
+    assert [parse_event(message)[1]['id'] for message in messages] == [
+        comment.pk for comment in missed
+    ]
+
+
+@pytest.mark.parametrize(
+    'method, news_id, status',
+    (
+        ('GET', 0, HTTPStatus.NOT_FOUND),
+        ('POST', None, HTTPStatus.METHOD_NOT_ALLOWED),
+    ),
+)
+def test_bad_event_requests(news, method, news_id, status):
+    scope = events_scope(news.pk if news_id is None else news_id, method)
+
+    async def scenario():
+        events = ApplicationCommunicator(application, scope)
+        await events.send_input({'type': 'http.request'})
+        start = await events.receive_output(1)
+        await events.wait(1)
+        return start
+
+    assert async_to_sync(scenario)()['status'] == status
+
+
+def test_other_paths_go_to_django():
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope['path'])
+
+    async_to_sync(CommentEvents(app))(
+        {'type': 'http', 'path': '/news/1/'}, None, None
+    )
+    assert calls == ['/news/1/']
+
+
+def test_lagging_subscriber_is_disconnected():
+    async def scenario():
+        broadcaster = CommentBroadcaster(queue_size=2)
+        queue = broadcaster.subscribe(1)
+        for index in range(3):
+            broadcaster.publish(1, str(index).encode())
+        await asyncio.sleep(0)
+        return broadcaster.has_subscribers(1), queue.get_nowait()
+
+    assert async_to_sync(scenario)() == (False, CLOSE)
@@ -1,9 +1,24 @@
+import json
+import os
+import time
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+
+import pytest
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import IntegrityError
 from django.urls import reverse
+from django.utils import timezone
 from pytest_django.asserts import assertRedirects, assertFormError
 from http import HTTPStatus
 
-from news.models import Comment
-from news.forms import BAD_WORDS, WARNING
+from news.ingest import CommentIngestQueue, get_ingest_queue
+from news.management.commands.load_news import iter_json_array
+from news.models import Comment, News, Trending
+from news.trending import get_trending, rebuild_trending
+from news.forms import BAD_WORDS, WARNING, CommentForm
 
 
 def test_user_can_create_comment(author_client, author, news, form_data_old):
@@ -20,6 +35,51 @@ def test_user_can_create_comment(author_client, author, news, form_data_old):
     assert comment.author == author
 
 
+@pytest.mark.django_db(transaction=True)
+def test_comment_is_written_through_ingest_queue(
+    author_client, news, form_data_old, settings
+):
+    settings.COMMENT_INGEST_QUEUE = True
+    url = reverse('news:detail', args=(news.id,))
+    response = author_client.post(url, data=form_data_old)
+    assertRedirects(response, f'{url}#comments')
+    assert get_ingest_queue()._thread.is_alive()
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_slow_ingest_queue_redirects_without_error(
+    author_client, news, form_data_old, settings, monkeypatch, caplog
+):
+    settings.COMMENT_INGEST_QUEUE = True
+    monkeypatch.setattr('news.ingest.RESULT_TIMEOUT', 0)
+    url = reverse('news:detail', args=(news.id,))
+    response = author_client.post(url, data=form_data_old)
+    assertRedirects(response, f'{url}#comments', fetch_redirect_response=False)
+    assert 'ждёт записи' in caplog.text
+    # Комментарий всё равно записывается, и ровно один раз.
+    for _ in range(100):
+        if Comment.objects.exists():
+            break
+        time.sleep(0.05)
+    assert Comment.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_ingest_queue_isolates_failed_comments(news, author):
+    ingest = CommentIngestQueue(batch_size=3, flush_interval=1)
+    saved = [
+        ingest.submit(Comment(news=news, author=author, text=str(index)))
+        for index in range(2)
+    ]
+    failed = ingest.submit(Comment(news=news, author=author, text=None))
+    with pytest.raises(IntegrityError):
+        failed.result(timeout=5)
+    assert all(future.result(timeout=5).pk for future in saved)
+    assert Comment.objects.count() == 2
+
+
 def test_anonymous_user_cant_create_comment(client, form_data_old, news):
     url = reverse('news:detail', args=(news.id,))
     comments_before = Comment.objects.count()
@@ -82,3 +142,206 @@ def test_user_cant_edit_comment_of_another_user(
     assert response.status_code == HTTPStatus.NOT_FOUND
     comm = Comment.objects.get(id=comment.id)
     assert comm.text == form_data_old['text']
+
+
+def test_comment_count_follows_create_and_delete(
+    author_client, news, form_data_old
+):
+    url = reverse('news:detail', args=(news.id,))
+    author_client.post(url, data=form_data_old)
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    comment = Comment.objects.get()
+    author_client.delete(reverse('news:delete', args=(comment.id,)))
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+def test_trending_follows_comments_and_matches_rebuild(
+    news, more_news, author
+):
+    hot = News.objects.exclude(pk=news.pk).first()
+    for _ in range(3):
+        Comment.objects.create(news=hot, author=author, text='Горячо')
+    comment = Comment.objects.create(news=news, author=author, text='Тепло')
+    assert get_trending(10) == [hot, news]
+    incremental = dict(Trending.objects.values_list('news_id', 'score'))
+    rebuild_trending()
+    rebuilt = dict(Trending.objects.values_list('news_id', 'score'))
+    assert rebuilt == pytest.approx(incremental)
+    comment.delete()
+    assert get_trending(10) == [hot]
+    assert not Trending.objects.filter(news=news).exists()
+
+
+@pytest.mark.django_db
+def test_generate_news_is_consistent():
+    call_command(
+        'generate_news', users=3, news=20, comments=300, days=2, seed=1,
+        stdout=StringIO(),
+    )
+    assert News.objects.count() == 20
+    assert Comment.objects.count() == 300
+    counts = News.objects.values_list('comment_count', flat=True)
+    assert sum(counts) == 300
+    # Комментарии распределены неравномерно.
+    assert max(counts) > 300 / 20 * 2
+    assert Trending.objects.exists()
+    assert not News.objects.filter(excerpt='').exists()
+    assert not Comment.objects.filter(text_html='').exists()
+
+
+def test_recount_comments_repairs_counters(news, more_comments):
+    News.objects.update(comment_count=0)
+    call_command('recount_comments', stdout=StringIO())
+    news.refresh_from_db()
+    assert news.comment_count == Comment.objects.filter(news=news).count()
+
+
+def test_edit_of_old_comment_redirects_to_its_page(
+    author_client, news, more_comments, form_data_new, settings
+):
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 3
+    oldest = Comment.objects.filter(news=news).first()
+    response = author_client.post(
+        reverse('news:edit', args=(oldest.id,)), data=form_data_new
+    )
+    assert response.url.endswith('#comments')
+    page = author_client.get(response.url).context['comments']
+    assert oldest.id in [comment.id for comment in page]
+
+
+@pytest.mark.parametrize(
+    'text',
+    ('РЕДИСКА', 'какой нeгoдяй!', 'рeдuскa', 'нег0дяй'),
+)
+def test_bad_words_are_found_in_disguise(text):
+    form = CommentForm(data={'text': text})
+    assert not form.is_valid()
+    assert form.errors['text'] == [WARNING]
+
+
+def test_bad_words_file_is_reloaded(tmp_path, settings):
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# список\nбяка\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = words_file
+    assert not CommentForm(data={'text': 'Ну ты бяка'}).is_valid()
+    assert CommentForm(data={'text': 'Ну ты бука'}).is_valid()
+    words_file.write_text('бука\n', encoding='utf-8')
+    os.utime(words_file, ns=(1, time.time_ns() + 10 ** 9))
+    assert not CommentForm(data={'text': 'Ну ты бука'}).is_valid()
+
+
+def test_missing_bad_words_file_falls_back_to_default_list(
+    tmp_path, settings, caplog
+):
+    settings.BAD_WORDS_FILE = tmp_path / 'missing.txt'
+    form = CommentForm(data={'text': f'Ну ты {BAD_WORDS[0]}'})
+    assert not form.is_valid()
+    assert 'BAD_WORDS_FILE' in caplog.text
+
+
+def test_load_news_streams_ndjson(tmp_path, author):
+    records = [
+        {'model': 'news.news', 'pk': 100, 'fields': {
+            'title': 'Новость', 'text': 'Текст', 'date': '2022-01-01',
+        }},
+    ] + [
+        {'model': 'news.comment', 'fields': {
+            'news': 100,
+            'author': [author.username],
+            'text': f'Комментарий {index}',
+            'created': f'2022-01-0{index + 1}T10:00:00+00:00',
+        }}
+        for index in range(3)
+    ]
+    path = tmp_path / 'dump.ndjson'
+    path.write_text(
+        '\n'.join(json.dumps(record) for record in records),
+        encoding='utf-8',
+    )
+    call_command('load_news', str(path), batch_size=2, stdout=StringIO())
+    news = News.objects.get(pk=100)
+    assert news.comment_count == 3
+    comment = Comment.objects.filter(news=news).last()
+    assert comment.author == author
+    assert comment.created.day == 3
+
+
+def test_derived_fields_follow_text(news, comment):
+    news.text = 'Новый текст'
+    news.save(update_fields=('text',))
+    comment.text = 'Правка\n<b>'
+    comment.save(update_fields=('text',))
+    news.refresh_from_db()
+    comment.refresh_from_db()
+    assert news.excerpt == 'Новый текст'
+    assert comment.text_html == 'Правка<br>&lt;b&gt;'
+
+
+def test_load_news_fills_derived_fields():
+    fixture = settings.BASE_DIR / 'news' / 'fixtures' / 'news.json'
+    call_command('load_news', str(fixture), stdout=StringIO())
+    assert not News.objects.filter(excerpt='').exists()
+
+
+def test_json_array_is_read_in_chunks():
+    fixture = settings.BASE_DIR / 'news' / 'fixtures' / 'news.json'
+    with open(fixture, encoding='utf-8') as file:
+        expected = json.load(file)
+    with open(fixture, encoding='utf-8') as file:
+        assert list(iter_json_array(file, read_size=7)) == expected
+
+
+def test_load_news_reads_fixture():
+    fixture = settings.BASE_DIR / 'news' / 'fixtures' / 'news.json'
+    call_command('load_news', str(fixture), stdout=StringIO())
+    with open(fixture, encoding='utf-8') as file:
+        assert News.objects.count() == len(json.load(file))
+
+
+@pytest.fixture
+def staff_client(django_user_model, client):
+    staff = django_user_model.objects.create(
+        username='Аналитик', is_staff=True
+    )
+    client.force_login(staff)
+    return client
+
+
+def test_export_streams_comments_with_authors_in_one_query(
+    staff_client, news, more_comments, author, django_assert_num_queries
+):
+    url = reverse('news:export', args=('comments',))
+    response = staff_client.get(url, {'format': 'ndjson', 'news': news.id})
+    assert response.streaming
+    with django_assert_num_queries(1):
+        rows = [json.loads(line) for line in response.streaming_content]
+    assert len(rows) == Comment.objects.filter(news=news).count()
+    assert {row['author__username'] for row in rows} == {author.username}
+
+
+# Вечер по UTC: по местному времени уже следующий день.
+@pytest.mark.parametrize(
+    'now', (datetime(2026, 10, 18, 22, 30, tzinfo=dt_timezone.utc),)
+)
+def test_export_filters_news_by_date(staff_client, more_news, now):
+    url = reverse('news:export', args=('news',))
+    # Даты новостей — по местному времени, как их сохраняет DateField.
+    today = timezone.localdate(now)
+    response = staff_client.get(url, {'date_from': today.isoformat()})
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    assert lines[0].startswith('id,title')
+    assert len(lines) == 2
+
+
+def test_export_is_for_staff_only(author_client):
+    url = reverse('news:export', args=('news',))
+    response = author_client.get(url)
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_export_command_writes_csv(more_news):
+    output = StringIO()
+    call_command('export_news', 'news', stdout=output)
+    assert len(output.getvalue().splitlines()) == len(more_news) + 1
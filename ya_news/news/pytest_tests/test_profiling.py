@@ -0,0 +1,52 @@
+import json
+import logging
+
+import pytest
+from django.urls import reverse
+
+
+def test_server_timing_splits_request_time(author_client, news):
+    response = author_client.get(reverse('news:detail', args=(news.id,)))
+    timing = dict(
+        part.strip().split(';', 1)
+        for part in response['Server-Timing'].split(',')
+    )
+    assert set(timing) == {'db', 'tpl', 'app', 'total'}
+    assert timing['db'].endswith('queries"')
+
+
+def test_request_is_logged_as_json(client):
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger('common.middleware.requests')
+    logger.addHandler(handler)
+    try:
+        client.get(reverse('news:home'))
+    finally:
+        logger.removeHandler(handler)
+    record, = records
+    assert json.loads(record.getMessage())['view'] == 'news:home'
+
+
+@pytest.mark.parametrize(
+    'mode, suffix', (('cprofile', '.prof'), ('tracemalloc', '.tracemalloc'))
+)
+def test_sampled_request_is_saved(client, settings, tmp_path, mode, suffix):
+    settings.PROFILE_SAMPLE_RATE = 1
+    settings.PROFILE_MODE = mode
+    settings.PROFILE_DIR = tmp_path
+    client.get(reverse('news:home'))
+    saved, = tmp_path.iterdir()
+    assert saved.name.endswith(suffix)
+    assert 'news-home' in saved.name
+
+
+@pytest.mark.parametrize('slow_ms, saved', ((0, 1), (60_000, 0)))
+def test_only_slow_requests_are_saved(
+    client, settings, tmp_path, slow_ms, saved
+):
+    settings.PROFILE_SLOW_MS = slow_ms
+    settings.PROFILE_DIR = tmp_path
+    client.get(reverse('news:home'))
+    assert len(list(tmp_path.iterdir())) == saved
@@ -0,0 +1,103 @@
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+
+from common.middleware import QueryBudgetExceeded
+from news.urls import urlpatterns
+from yanews.urls import auth_urls
+
+LOGIN_DATA = {'username': 'Читатель', 'password': 'Пароль123'}
+
+
+@pytest.fixture
+def reader(django_user_model):
+    return django_user_model.objects.create_user(**LOGIN_DATA)
+
+
+@pytest.fixture
+def cases(client, author_client, admin_client, news, comment):
+    detail_url = reverse('news:detail', args=(news.id,))
+    return {
+        'news:home': ((author_client, 'get', reverse('news:home'), None),),
+        'news:archive': (
+            (author_client, 'get', reverse('news:archive'), None),
+        ),
+        'news:search': (
+            (author_client, 'get', reverse('news:search'), {'q': news.title}),
+        ),
+        'news:detail': (
+            (author_client, 'get', detail_url, None),
+            (author_client, 'post', detail_url, {'text': 'Новый'}),
+        ),
+        'news:edit': (
+            (author_client, 'get', reverse('news:edit', args=(comment.id,)),
+             None),
+            (author_client, 'post', reverse('news:edit', args=(comment.id,)),
+             {'text': 'Правка'}),
+        ),
+        'news:delete': (
+            (author_client, 'get', reverse('news:delete', args=(comment.id,)),
+             None),
+            (author_client, 'post',
+             reverse('news:delete', args=(comment.id,)), None),
+        ),
+        'news:export': (
+            (admin_client, 'get', reverse('news:export', args=('news',)),
+             None),
+        ),
+        'users:login': (
+            (client, 'get', reverse('users:login'), None),
+            (client, 'post', reverse('users:login'), LOGIN_DATA),
+        ),
+        'users:logout': (
+            (author_client, 'get', reverse('users:logout'), None),
+        ),
+        'users:signup': (
+            (client, 'get', reverse('users:signup'), None),
+            (client, 'post', reverse('users:signup'), {
+                'username': 'Новичок',
+                'password1': 'Пароль123',
+                'password2': 'Пароль123',
+            }),
+        ),
+    }
+
+
+def route_names():
+    return [f'news:{pattern.name}' for pattern in urlpatterns] + [
+        f'users:{pattern.name}' for pattern in auth_urls[0]
+    ]
+
+
+def test_every_route_has_budget(settings):
+    assert set(route_names()) == set(settings.QUERY_BUDGETS)
+
+
+@pytest.mark.parametrize('name', route_names())
+def test_route_fits_query_budget(
+    name, cases, settings, reader, django_assert_max_num_queries
+):
+    for client, method, url, data in cases[name]:
+        with django_assert_max_num_queries(settings.QUERY_BUDGETS[name]):
+            response = getattr(client, method)(url, data)
+            if response.streaming:
+                b''.join(response.streaming_content)
+
+
+def test_middleware_raises_over_budget(client, news):
+    budgets = {'news:detail': 1}
+    with override_settings(
+        QUERY_BUDGETS=budgets, QUERY_BUDGET_ACTION='raise'
+    ):
+        with pytest.raises(QueryBudgetExceeded):
+            client.get(reverse('news:detail', args=(news.id,)))
+
+
+def test_streaming_queries_count_against_budget(admin_client, more_news):
+    url = reverse('news:export', args=('news',))
+    with override_settings(
+        QUERY_BUDGETS={'news:export': 0}, QUERY_BUDGET_ACTION='raise'
+    ):
+        response = admin_client.get(url)
+        with pytest.raises(QueryBudgetExceeded):
+            b''.join(response.streaming_content)
@@ -0,0 +1,53 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from news.cache import get_news_total
+
+# Полный проход по таблице без индекса или сортировка во временном дереве.
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?\w+$|TEMP B-TREE')
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_scans(client, url):
+    with CaptureQueriesContext(connection) as context:
+        client.get(url)
+    return [
+        (query['sql'], step)
+        for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        for step in explain(query['sql'])
+        if FULL_SCAN.search(step)
+    ]
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('news:home', None),
+        ('news:archive', None),
+        ('news:detail', pytest.lazy_fixture('news_args')),
+    ),
+)
+def test_read_views_use_indexes(client, more_comments, name, args):
+    get_news_total()
+    assert full_scans(client, reverse(name, args=args)) == []
+
+
+@pytest.mark.parametrize('name', ('news:edit', 'news:delete'))
+def test_comment_views_use_indexes(author_client, comment, name):
+    url = reverse(name, args=(comment.id,))
+    assert full_scans(author_client, url) == []
+
+
+@pytest.fixture
+def news_args(news):
+    return (news.id,)
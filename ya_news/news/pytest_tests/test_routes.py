@@ -8,7 +8,7 @@ from django.urls import reverse
 @pytest.mark.parametrize(
     'name',
     (
-        'news:home', 'users:login',
+        'news:home', 'news:archive', 'users:login',
         'users:logout', 'users:signup'
     )
 )
@@ -0,0 +1,80 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from news.models import Comment, News
+from news.moderation import delete_comments, delete_users
+from news.routers import (
+    PIN_COOKIE, PRIMARY, PrimaryReplicaRouter, ReadYourWritesMiddleware,
+    use_primary
+)
+
+REPLICAS = ('replica_1', 'replica_2')
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASES = {
+        PRIMARY: settings.DATABASES[PRIMARY],
+        **{alias: {} for alias in REPLICAS},
+    }
+
+
+@pytest.fixture
+def router():
+    return PrimaryReplicaRouter()
+
+
+def test_reads_go_to_replicas(replicas, router):
+    assert {router.db_for_read(News) for _ in range(50)} == set(REPLICAS)
+
+
+def test_writes_go_to_primary(replicas, router):
+    assert router.db_for_write(Comment) == PRIMARY
+
+
+def test_without_replicas_reads_go_to_primary(router):
+    assert router.db_for_read(News) == PRIMARY
+
+
+def test_pinned_reads_go_to_primary(replicas, router):
+    with use_primary():
+        assert router.db_for_read(News) == PRIMARY
+    assert router.db_for_read(News) in REPLICAS
+
+
+def read_database(request):
+    response = HttpResponse(PrimaryReplicaRouter().db_for_read(Comment))
+    return response
+
+
+def test_writer_keeps_reading_from_primary(replicas):
+    middleware = ReadYourWritesMiddleware(read_database)
+    factory = RequestFactory()
+    response = middleware(factory.post('/news/1/'))
+    assert response.content.decode() == PRIMARY
+    cookie = response.cookies[PIN_COOKIE].value
+    request = factory.get('/news/1/')
+    request.COOKIES[PIN_COOKIE] = cookie
+    assert middleware(request).content.decode() == PRIMARY
+    response = middleware(factory.get('/news/1/'))
+    assert response.content.decode() in REPLICAS
+
+
+def test_moderation_deletes_work_on_primary(
+    author, not_author, news, more_comments, replicas
+):
+    """
+    Реплик в соединениях нет: запрос, ушедший на реплику, упадёт.
+    Удаление должно и читать, и писать в основной базе.
+    """
+    Comment.objects.using(PRIMARY).create(
+        news=news, author=not_author, text='Чужой'
+    )
+    comment = Comment.objects.using(PRIMARY).filter(author=author).first()
+    assert delete_comments(Comment.objects.filter(pk=comment.pk)) == 1
+    assert delete_users(get_user_model().objects.filter(pk=author.pk)) == 1
+    with use_primary():
+        news.refresh_from_db()
+        assert news.comment_count == Comment.objects.count() == 1
@@ -0,0 +1,132 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils.http import http_date
+
+from news.middleware import SnapshotMiddleware
+from news.models import Comment, News
+from news.snapshots import get_publisher, get_snapshot_path, publish
+
+SNAPSHOT = b'<html>snapshot</html>'
+
+
+@pytest.fixture
+def snapshot_dir(settings, tmp_path):
+    settings.SNAPSHOT_DIR = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def detail_url(news):
+    return reverse('news:detail', args=(news.pk,))
+
+
+@pytest.fixture
+def detail_snapshot(snapshot_dir, detail_url):
+    target = get_snapshot_path(detail_url)
+    target.parent.mkdir(parents=True)
+    target.write_bytes(SNAPSHOT)
+    return target
+
+
+def test_snapshot_is_the_anonymous_page(
+    client, snapshot_dir, news, comment, detail_url
+):
+    expected = client.get(detail_url).content
+    publish(detail_url)
+    assert get_snapshot_path(detail_url).read_bytes() == expected
+    assert (snapshot_dir / 'news' / str(news.pk) / 'index.html').exists()
+
+
+def test_anonymous_get_is_served_without_view(
+    client, detail_snapshot, detail_url, django_assert_num_queries
+):
+    with django_assert_num_queries(0):
+        response = client.get(detail_url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == SNAPSHOT
+
+
+def test_unchanged_snapshot_is_not_modified(
+    client, detail_snapshot, detail_url
+):
+    response = client.get(
+        detail_url,
+        HTTP_IF_MODIFIED_SINCE=http_date(detail_snapshot.stat().st_mtime),
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_snapshot_has_last_modified(client, detail_snapshot, detail_url):
+    response = client.get(detail_url)
+    assert response['Last-Modified'] == http_date(
+        detail_snapshot.stat().st_mtime
+    )
+
+
+def test_head_snapshot_has_no_body(rf, detail_snapshot, detail_url):
+    # Тестовый клиент сам вырезает тело у HEAD, поэтому без него.
+    middleware = SnapshotMiddleware(lambda request: None)
+    response = middleware(rf.head(detail_url))
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == b''
+    assert response['Content-Length'] == str(len(SNAPSHOT))
+    assert response['Last-Modified'] == http_date(
+        detail_snapshot.stat().st_mtime
+    )
+
+
+@pytest.mark.parametrize(
+    'make_client, data',
+    (
+        (pytest.lazy_fixture('author_client'), None),
+        (pytest.lazy_fixture('client'), {'cursor': 'x'}),
+    ),
+)
+def test_users_and_query_strings_go_to_view(
+    make_client, data, detail_snapshot, detail_url
+):
+    response = make_client.get(detail_url, data)
+    assert response.content != SNAPSHOT
+
+
+def test_comment_post_goes_to_view(
+    author_client, detail_snapshot, detail_url, form_data_old
+):
+    response = author_client.post(detail_url, data=form_data_old)
+    assert response.status_code == HTTPStatus.FOUND
+    assert Comment.objects.count() == 1
+
+
+def test_path_outside_snapshot_dir_is_ignored(snapshot_dir):
+    assert get_snapshot_path('/../') is None
+
+
+def test_missing_news_snapshot_is_removed(detail_snapshot, news, detail_url):
+    News.objects.filter(pk=news.pk).delete()
+    publish(detail_url)
+    assert not detail_snapshot.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_snapshots_are_republished_after_commit(
+    author, news, detail_url, snapshot_dir
+):
+    Comment.objects.create(news=news, author=author, text='Свежий')
+    get_publisher().wait()
+    assert 'Свежий' in get_snapshot_path(detail_url).read_text()
+    assert get_snapshot_path(reverse('news:home')).exists()
+    news.delete()
+    get_publisher().wait()
+    assert not get_snapshot_path(detail_url).exists()
+
+
+def test_publish_snapshots_command(snapshot_dir, more_news):
+    call_command('publish_snapshots', clear=True, stdout=StringIO())
+    assert get_snapshot_path(reverse('news:home')).exists()
+    for pk in News.objects.values_list('pk', flat=True):
+        assert get_snapshot_path(reverse('news:detail', args=(pk,))).exists()
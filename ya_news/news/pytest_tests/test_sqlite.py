@@ -0,0 +1,30 @@
+import pytest
+from django.db import connections
+
+PRAGMAS = {'busy_timeout': 1234, 'synchronous': 'NORMAL'}
+
+
+def read_pragmas(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA busy_timeout')
+        busy_timeout, = cursor.fetchone()
+        cursor.execute('PRAGMA synchronous')
+        synchronous, = cursor.fetchone()
+    return busy_timeout, synchronous
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'pragmas, expected',
+    (
+        (PRAGMAS, (1234, 1)),
+        ({}, (5000, 2)),
+    ),
+)
+def test_new_connection_gets_pragmas(settings, pragmas, expected):
+    settings.SQLITE_PRAGMAS = pragmas
+    connection = connections.create_connection('default')
+    try:
+        assert read_pragmas(connection) == expected
+    finally:
+        connection.close()
@@ -0,0 +1,99 @@
+import random
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY = 'default'
+REPLICA_PREFIX = 'replica_'
+PIN_COOKIE = 'db_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_use_primary = ContextVar('use_primary', default=False)
+
+
+@contextmanager
+def use_primary():
+    """Внутри блока все чтения идут в основную базу."""
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+def get_replicas():
+    return [
+        alias for alias in settings.DATABASES
+        if alias.startswith(REPLICA_PREFIX)
+    ]
+
+
+class PrimaryReplicaRouter:
+    """
+    Чтение — с реплик, запись — в основную базу.
+
+    Реплики описываются в settings.DATABASES под именами replica_N.
+    Пока реплик нет или чтение закреплено за основной базой
+    (см. ReadYourWritesMiddleware), всё идёт в default.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _use_primary.get():
+            return PRIMARY
+        replicas = get_replicas()
+        if not replicas:
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """В репликах те же данные, что в основной базе."""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Схема одна на все базы: локальные реплики мигрируются тоже."""
+        return True
+
+
+class ReadYourWritesMiddleware:
+    """
+    Закрепляет чтение за основной базой для того, кто только что писал.
+
+    Изменяющий запрос (POST, DELETE…) целиком работает с основной базой
+    и ставит cookie на settings.READ_YOUR_WRITES_SECONDS. Пока cookie
+    не истекла, чтения этого клиента тоже идут в основную базу,
+    и он видит свой комментарий, даже если реплика отстаёт.
+    Должен стоять до SessionMiddleware: сессию тоже читаем с основной.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not get_replicas():
+            return self.get_response(request)
+        writing = request.method not in SAFE_METHODS
+        pinned = writing or self.is_pinned(request)
+        with use_primary() if pinned else nullcontext():
+            response = self.get_response(request)
+        if writing:
+            seconds = settings.READ_YOUR_WRITES_SECONDS
+            response.set_cookie(
+                PIN_COOKIE,
+                str(time.time() + seconds),
+                max_age=seconds,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    @staticmethod
+    def is_pinned(request):
+        try:
+            return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
@@ -0,0 +1,101 @@
+import datetime
+import re
+
+from django.db import connection
+from django.http import Http404
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .pagination import dump_cursor, load_cursor
+
+# Заголовок весит больше текста.
+BM25 = 'bm25(news_news_fts, 10.0, 1.0)'
+# Управляющие символы не встречаются в тексте и не ломают экранирование.
+MARK_START = '\x02'
+MARK_END = '\x03'
+SNIPPET_TOKENS = 16
+
+SEARCH_SQL = f"""
+    SELECT news_news.id, news_news.title, news_news.date, {BM25} AS score
+    FROM news_news_fts
+    JOIN news_news ON news_news.id = news_news_fts.rowid
+    WHERE news_news_fts MATCH %s AND ({BM25}, news_news.id) > (%s, %s)
+    ORDER BY score, news_news.id
+    LIMIT %s
+"""
+SNIPPET_SQL = f"""
+    SELECT rowid, snippet(news_news_fts, -1, %s, %s, '…', {SNIPPET_TOKENS})
+    FROM news_news_fts
+    WHERE news_news_fts MATCH %s AND rowid IN ({{ids}})
+"""
+
+
+class SearchResult:
+
+    def __init__(self, pk, title, date, score, snippet=''):
+        self.pk = pk
+        self.title = title
+        # Сырой запрос к SQLite возвращает дату строкой.
+        if isinstance(date, str):
+            date = datetime.date.fromisoformat(date)
+        self.date = date
+        self.score = score
+        self.snippet = snippet
+
+
+def to_match_expression(query):
+    """
+    Превращает ввод пользователя в запрос FTS5.
+
+    Каждое слово берётся в кавычки и ищется по префиксу,
+    поэтому операторы FTS5 во вводе не ломают запрос.
+    """
+    words = re.findall(r'\w+', query.lower())
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def highlight(snippet):
+    """Экранирует фрагмент и подсвечивает найденные слова."""
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+def search_news(query, cursor=None, limit=20):
+    """
+    Новости по релевантности bm25 и курсор на следующую страницу.
+
+    Курсор хранит (score, id) последней найденной новости,
+    фрагменты с подсветкой считаются только для выданной страницы.
+    """
+    match = to_match_expression(query)
+    if not match:
+        return [], None
+    after = (float('-inf'), 0)
+    if cursor:
+        try:
+            score, pk = load_cursor(cursor)
+            after = (float(score), int(pk))
+        except (ValueError, TypeError):
+            raise Http404('Некорректный курсор.')
+    with connection.cursor() as db:
+        db.execute(SEARCH_SQL, [match, *after, limit + 1])
+        results = [SearchResult(*row) for row in db.fetchall()]
+        has_more = len(results) > limit
+        results = results[:limit]
+        if results:
+            ids = [result.pk for result in results]
+            db.execute(
+                SNIPPET_SQL.format(ids=', '.join(['%s'] * len(ids))),
+                [MARK_START, MARK_END, match, *ids],
+            )
+            snippets = dict(db.fetchall())
+            for result in results:
+                result.snippet = highlight(snippets.get(result.pk, ''))
+    next_cursor = None
+    if has_more:
+        last = results[-1]
+        next_cursor = dump_cursor([last.score, last.pk])
+    return results, next_cursor
@@ -0,0 +1,74 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from django.utils import timezone
+
+from .cache import invalidate_home_page, reset_news_total
+from .events import schedule_comment
+from .models import ArchivedComment, Comment, News
+from .snapshots import schedule_news
+from .trending import add_comment, remove_comment
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw, **kwargs):
+    """Новый комментарий увеличивает счётчик и рейтинг новости."""
+    news = News.objects.filter(pk=instance.news_id)
+    if created and not raw:
+        news.update(
+            comment_count=F('comment_count') + 1,
+            changed_at=timezone.now(),
+        )
+        add_comment(instance.news_id, instance.created)
+        invalidate_home_page()
+        schedule_comment(instance)
+    else:
+        news.touch()
+    schedule_news(instance.news_id)
+
+
+@receiver(post_save, sender=ArchivedComment)
+def archived_comment_saved(sender, instance, raw, **kwargs):
+    """
+    Архивный комментарий правят на месте: меняется только страница.
+
+    Обработчика удаления у архива нет, иначе каскад при удалении
+    новости или пользователя загружал бы каждый комментарий. Счётчики
+    чинят те, кто удаляет: news.moderation и CommentDelete.
+    """
+    if not raw:
+        News.objects.filter(pk=instance.news_id).touch()
+        schedule_news(instance.news_id)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    """
+    Удалённый комментарий уменьшает счётчик и рейтинг новости.
+
+    Для архивного комментария обработчик зовёт представление удаления.
+    """
+    News.objects.filter(pk=instance.news_id).update(
+        comment_count=Greatest(F('comment_count') - 1, 0),
+        changed_at=timezone.now(),
+    )
+    remove_comment(instance.news_id, instance.created)
+    invalidate_home_page()
+    schedule_news(instance.news_id)
+
+
+@receiver(post_save, sender=News)
+def news_saved(sender, instance, created, **kwargs):
+    if created:
+        reset_news_total()
+    invalidate_home_page()
+    schedule_news(instance.pk)
+
+
+@receiver(post_delete, sender=News)
+def news_deleted(sender, instance, **kwargs):
+    reset_news_total()
+    invalidate_home_page()
+    schedule_news(instance.pk)
@@ -0,0 +1,176 @@
+import logging
+import os
+import queue
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import close_old_connections, transaction
+from django.http import Http404, HttpRequest
+from django.urls import Resolver404, resolve, reverse
+from django.utils import translation
+from django.utils._os import safe_join
+
+from .routers import use_primary
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.html'
+
+
+def get_snapshot_path(path):
+    """
+    Файл снимка для адреса страницы или None, если снимка быть не может.
+
+    Снимок хранится в SNAPSHOT_DIR по тому же пути, что и адрес:
+    /news/5/ → SNAPSHOT_DIR/news/5/index.html.
+    """
+    if not settings.SNAPSHOT_DIR or not path.endswith('/'):
+        return None
+    try:
+        directory = safe_join(settings.SNAPSHOT_DIR, path.lstrip('/'))
+    except SuspiciousFileOperation:
+        return None
+    return Path(directory) / INDEX_FILE
+
+
+def render_page(path):
+    """
+    HTML страницы, каким его видит гость, или None, если страницы нет.
+
+    Представление вызывается напрямую, без middleware: гостю не нужны
+    ни сессия, ни CSRF. Читаем из основной базы, чтобы не снять
+    страницу с отстающей реплики.
+    """
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = path
+    request.user = AnonymousUser()
+    try:
+        request.resolver_match = match = resolve(path)
+    except Resolver404:
+        return None
+    with use_primary(), translation.override(settings.LANGUAGE_CODE):
+        try:
+            response = match.func(request, *match.args, **match.kwargs)
+        except Http404:
+            return None
+        if hasattr(response, 'render'):
+            response.render()
+    if response.status_code != 200:
+        return None
+    return response.content
+
+
+def write_atomic(target, content):
+    """Пишет файл целиком: читатель видит либо старый снимок, либо новый."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=target.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(content)
+        os.replace(temp, target)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def publish(path):
+    """Снимает страницу заново, а если её больше нет — удаляет снимок."""
+    target = get_snapshot_path(path)
+    if target is None:
+        return
+    content = render_page(path)
+    if content is None:
+        target.unlink(missing_ok=True)
+    else:
+        write_atomic(target, content)
+
+
+class SnapshotPublisher:
+    """
+    Поток, который пересобирает снимки страниц.
+
+    Адреса копятся в очереди; поток забирает всё накопившееся разом,
+    поэтому сотня комментариев к одной новости подряд пересобирает
+    её страницу один-два раза, а не сто.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='snapshot-publisher', daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, paths):
+        self._start()
+        for path in paths:
+            self._queue.put(path)
+
+    def wait(self):
+        """Ждёт, пока будут пересобраны все поставленные адреса."""
+        self._queue.join()
+
+    def _collect(self):
+        paths = [self._queue.get()]
+        while True:
+            try:
+                paths.append(self._queue.get_nowait())
+            except queue.Empty:
+                return paths
+
+    def _run(self):
+        while True:
+            paths = self._collect()
+            try:
+                close_old_connections()
+                for path in dict.fromkeys(paths):
+                    try:
+                        publish(path)
+                    except Exception:
+                        logger.exception('Не удалось снять %s', path)
+            finally:
+                for _ in paths:
+                    self._queue.task_done()
+
+
+_lock = threading.Lock()
+_publisher = None
+
+
+def get_publisher():
+    global _publisher
+    if _publisher is None:
+        with _lock:
+            if _publisher is None:
+                _publisher = SnapshotPublisher()
+    return _publisher
+
+
+def get_news_paths(news_ids):
+    """Главная и страницы новостей: они меняются вместе с новостями."""
+    return [reverse('news:home')] + [
+        reverse('news:detail', args=(pk,)) for pk in news_ids
+    ]
+
+
+def schedule_news(*news_ids):
+    """
+    После коммита пересобирает снимки главной и страниц новостей.
+
+    Без settings.SNAPSHOT_DIR ничего не делает.
+    """
+    if not settings.SNAPSHOT_DIR:
+        return
+    paths = get_news_paths(news_ids)
+    transaction.on_commit(lambda: get_publisher().submit(paths))
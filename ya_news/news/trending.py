@@ -0,0 +1,111 @@
+import math
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import Exp, Ln
+from django.utils import timezone
+
+from .models import Comment, Trending
+
+# Общая точка отсчёта весов: от неё считаются все оценки.
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+# Комментарии старше стольких периодов полураспада весят меньше 1e-6,
+# при пересборке они не учитываются.
+HORIZON_HALF_LIVES = 20
+# Оценка не выше веса удаляемого комментария значит, что он был последним.
+EPSILON = 1e-6
+BATCH_SIZE = 1000
+# log(e^score + e^weight) без переполнения, одним запросом.
+ADD_SQL = f"""
+    INSERT INTO {Trending._meta.db_table} (news_id, score) VALUES (%s, %s)
+    ON CONFLICT (news_id) DO UPDATE SET score =
+        MAX(score, excluded.score)
+        + LN(1 + EXP(-ABS(score - excluded.score)))
+"""
+
+
+def get_tau():
+    """Время, за которое вес комментария падает в e раз, в секундах."""
+    return settings.TRENDING_HALF_LIFE_HOURS * 3600 / math.log(2)
+
+
+def log_weight(created):
+    """Логарифм веса комментария, отсчитанный от EPOCH."""
+    return (created - EPOCH).total_seconds() / get_tau()
+
+
+def logaddexp(a, b):
+    """log(e^a + e^b) без переполнения."""
+    return max(a, b) + math.log1p(math.exp(-abs(a - b)))
+
+
+def add_comment(news_id, created):
+    """Добавляет вес нового комментария к оценке новости."""
+    with connection.cursor() as cursor:
+        cursor.execute(ADD_SQL, (news_id, log_weight(created)))
+
+
+def remove_comment(news_id, created):
+    """Вычитает вес удалённого комментария из оценки новости."""
+    weight = log_weight(created)
+    Trending.objects.filter(pk=news_id, score__lte=weight + EPSILON).delete()
+    Trending.objects.filter(pk=news_id).update(
+        score=F('score') + Ln(1 - Exp(weight - F('score')))
+    )
+
+
+def get_trending(limit):
+    """
+    Самые обсуждаемые сейчас новости, одним запросом по индексу.
+
+    Новость попадает в список, если её комментарии вместе весят
+    не меньше settings.TRENDING_MIN_SCORE только что написанных.
+    """
+    threshold = log_weight(timezone.now()) + math.log(
+        settings.TRENDING_MIN_SCORE
+    )
+    return [
+        trending.news for trending in Trending.objects.filter(
+            score__gte=threshold
+        ).select_related('news').defer(
+            'news__text', 'news__excerpt'
+        ).order_by('-score')[:limit]
+    ]
+
+
+def rebuild_trending(batch_size=BATCH_SIZE, news_ids=None):
+    """
+    Пересчитывает рейтинг по таблице комментариев.
+
+    Если передан news_ids, только для этих новостей.
+    Возвращает число пересчитанных новостей в рейтинге.
+    """
+    since = timezone.now() - timedelta(
+        hours=settings.TRENDING_HALF_LIFE_HOURS * HORIZON_HALF_LIVES
+    )
+    comments = Comment.objects.filter(created__gte=since).order_by()
+    trending = Trending.objects.all()
+    if news_ids is not None:
+        comments = comments.filter(news_id__in=news_ids)
+        trending = trending.filter(news_id__in=news_ids)
+    scores = {}
+    for news_id, created in comments.values_list(
+        'news_id', 'created'
+    ).iterator(chunk_size=batch_size):
+        weight = log_weight(created)
+        score = scores.get(news_id)
+        scores[news_id] = (
+            weight if score is None else logaddexp(score, weight)
+        )
+    with transaction.atomic():
+        trending.delete()
+        Trending.objects.bulk_create(
+            (
+                Trending(news_id=news_id, score=score)
+                for news_id, score in scores.items()
+            ),
+            batch_size=batch_size,
+        )
+    return len(scores)
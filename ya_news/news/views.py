@@ -1,11 +1,65 @@
+from urllib.parse import urlencode
+
 from django.conf import settings
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import (
+    LoginRequiredMixin, UserPassesTestMixin
+)
+from django.http import (
+    Http404, HttpResponseBadRequest, HttpResponseRedirect,
+    StreamingHttpResponse
+)
 from django.shortcuts import get_object_or_404
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
+
+from .cache import get_home_page, get_news_total
+from .conditional import news_etag, news_last_modified
+from .export import CONTENT_TYPES, EXPORTS, get_export_rows, iter_export
+from .forms import CommentForm, ExportForm
+from .ingest import save_comment
+from .models import ArchivedComment, Comment, News
+from .pagination import KeysetPaginator
+from .search import search_news
+from .signals import comment_deleted
+from .trending import get_trending
+
+
+def get_comments_paginator(news_id, archived=False):
+    """
+    Ветка комментариев новости, по умолчанию открыта последняя страница.
+
+    Ветки старых новостей лежат в архиве (см. news.archive). Для них
+    читается и рабочая таблица: новые комментарии пишутся туда, пока
+    их не перенесёт следующий запуск архивации.
+    """
+    models = (Comment, ArchivedComment) if archived else (Comment,)
+    return KeysetPaginator(
+        [
+            model.objects.filter(news_id=news_id).select_related(
+                'author'
+            ).defer('text')
+            for model in models
+        ],
+        ordering=Comment._meta.ordering,
+        per_page=settings.COMMENTS_COUNT_ON_DETAIL_PAGE,
+        from_end=True,
+    )
+
+
+def get_comment_url(comment, archived=False):
+    """
+    Адрес страницы ветки, на которой находится комментарий.
 
-from .forms import CommentForm
-from .models import Comment, News
+    archived — ветка новости в архиве, как в get_comments_paginator.
+    """
+    url = reverse('news:detail', kwargs={'pk': comment.news_id})
+    paginator = get_comments_paginator(comment.news_id, archived)
+    if not paginator.is_on_last_page(comment):
+        url += '?' + urlencode({'cursor': paginator.cursor_up_to(comment)})
+    return url + '#comments'
 
 
 class NewsList(generic.ListView):
@@ -17,23 +71,98 @@ class NewsList(generic.ListView):
         """
         Выводим только несколько последних новостей.
 
-        Их количество определяется в настройках проекта.
+        Их количество определяется в настройках проекта. Полный текст
+        не нужен: на главной только готовое начало из excerpt.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return self.model.objects.defer('text')[
+            :settings.NEWS_COUNT_ON_HOME_PAGE
+        ]
 
+    def get_context_data(self, **kwargs):
+        """
+        Список новостей одинаков для всех посетителей и берётся из кеша.
+
+        Для каждого запроса рендерится только шапка с пользователем.
+        """
+        context = super().get_context_data(**kwargs)
+        context['news_list_html'] = get_home_page(
+            lambda: render_to_string(
+                'news/includes/news_list.html',
+                {
+                    'object_list': self.object_list,
+                    'trending': get_trending(
+                        settings.TRENDING_COUNT_ON_HOME_PAGE
+                    ),
+                },
+            )
+        )
+        return context
 
-class NewsDetail(generic.DetailView):
+
+class NewsArchive(generic.ListView):
+    """Архив всех новостей, листается курсором по (-date, -id)."""
+    queryset = News.objects.defer('text', 'excerpt')
+    template_name = 'news/archive.html'
+
+    def get_context_data(self, **kwargs):
+        page = KeysetPaginator(
+            self.object_list,
+            ordering=('-date', '-id'),
+            per_page=settings.NEWS_COUNT_ON_ARCHIVE_PAGE,
+        ).page(self.request.GET.get('cursor'))
+        context = super().get_context_data(
+            object_list=page.object_list, **kwargs
+        )
+        context['page'] = page
+        context['news_total'] = get_news_total()
+        return context
+
+
+class NewsSearch(generic.TemplateView):
+    """Полнотекстовый поиск по заголовкам и текстам новостей."""
+    template_name = 'news/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        results, next_cursor = search_news(
+            query,
+            cursor=self.request.GET.get('cursor'),
+            limit=settings.NEWS_COUNT_ON_SEARCH_PAGE,
+        )
+        context.update(
+            query=query, results=results, next_cursor=next_cursor
+        )
+        return context
+
+
+class CommentsPageMixin:
+    """Добавляет в контекст одну страницу комментариев к новости."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = get_comments_paginator(
+            self.object.pk, self.object.comments_archived
+        ).page(self.request.GET.get('cursor'))
+        return context
+
+
+@method_decorator(
+    condition(etag_func=news_etag, last_modified_func=news_last_modified),
+    name='get',
+)
+class NewsDetail(CommentsPageMixin, generic.DetailView):
+    """
+    Новость с комментариями.
+
+    Валидаторы считаются до загрузки ветки, поэтому на неизменившуюся
+    страницу отвечаем 304 без рендеринга.
+    """
     model = News
     template_name = 'news/detail.html'
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
+        return get_object_or_404(self.model, pk=self.kwargs['pk'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -44,6 +173,7 @@ class NewsDetail(generic.DetailView):
 
 class NewsComment(
         LoginRequiredMixin,
+        CommentsPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -56,41 +186,67 @@ class NewsComment(
         return super().post(request, *args, **kwargs)
 
     def form_valid(self, form):
+        """
+        Комментарий пишется в рабочую таблицу, даже если ветка
+        в архиве: страница читает обе, а archive_comments потом
+        перенесёт его к остальным.
+        """
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        self.comment = save_comment(comment)
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        if self.comment is None:
+            # Комментарий ещё в очереди записи: появится в конце ветки.
+            return reverse('news:detail', args=(self.object.pk,)) + (
+                '#comments'
+            )
+        return get_comment_url(self.comment, self.object.comments_archived)
 
 
 class NewsDetailView(generic.View):
+    """GET показывает новость, POST добавляет к ней комментарий."""
+    detail_view = staticmethod(NewsDetail.as_view())
+    comment_view = staticmethod(NewsComment.as_view())
 
     def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
-        return view(request, *args, **kwargs)
+        return self.detail_view(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
-        view = NewsComment.as_view()
-        return view(request, *args, **kwargs)
+        return self.comment_view(request, *args, **kwargs)
 
 
 class CommentBase(LoginRequiredMixin):
-    """Базовый класс для работы с комментариями."""
+    """
+    Базовый класс для работы с комментариями.
+
+    Архивный комментарий правится и удаляется прямо в архиве,
+    ветка в рабочую таблицу не возвращается.
+    """
     model = Comment
+    # Объект может быть и архивным комментарием.
+    context_object_name = 'comment'
 
     def get_success_url(self):
-        comment = self.get_object()
-        return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
-        ) + '#comments'
+        """Комментарий уже загружен в self.object, повторно не читаем."""
+        return get_comment_url(
+            self.object, self.object.news.comments_archived
+        )
 
-    def get_queryset(self):
+    def get_queryset(self, model=None):
         """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        return (model or self.model).objects.filter(
+            author=self.request.user
+        ).select_related('news')
+
+    def get_object(self, queryset=None):
+        """Комментарий из рабочей таблицы, а если его там нет — из архива."""
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            return super().get_object(self.get_queryset(ArchivedComment))
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
@@ -102,3 +258,42 @@ class CommentUpdate(CommentBase, generic.UpdateView):
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+    def delete(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        if isinstance(self.object, ArchivedComment):
+            success_url = self.get_success_url()
+            self.object.delete()
+            # У архива нет сигнала удаления: счётчик новости чиним сами.
+            comment_deleted(ArchivedComment, self.object)
+            return HttpResponseRedirect(success_url)
+        return super().delete(request, *args, **kwargs)
+
+
+class Export(LoginRequiredMixin, UserPassesTestMixin, generic.View):
+    """Потоковая выгрузка новостей или комментариев для аналитики."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, kind):
+        if kind not in EXPORTS:
+            raise Http404('Неизвестная выгрузка.')
+        form = ExportForm(request.GET)
+        if not form.is_valid():
+            return HttpResponseBadRequest(form.errors.as_text())
+        file_format = form.cleaned_data['format']
+        header, rows = get_export_rows(
+            kind,
+            date_from=form.cleaned_data['date_from'],
+            date_to=form.cleaned_data['date_to'],
+            news_id=form.cleaned_data['news'],
+        )
+        response = StreamingHttpResponse(
+            iter_export(file_format, header, rows),
+            content_type=CONTENT_TYPES[file_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{kind}.{file_format}"'
+        )
+        return response
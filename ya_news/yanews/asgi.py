@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
 
 application = get_asgi_application()
+
+# Импорт после настройки Django: news.events загружает модели.
+from news.events import CommentEvents  # noqa: E402
+
+# Поток новых комментариев /news/<id>/events/, остальное — Django.
+application = CommentEvents(application)
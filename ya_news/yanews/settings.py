@@ -1,8 +1,11 @@
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Общий для ya_news и ya_note пакет common лежит в корне репозитория.
+sys.path.append(str(BASE_DIR.parent))
 
 SECRET_KEY = 'django-insecure-7)dgs++2!#==aye4rd=5)c)bw0eokiyqx0hts6#t80!$c&$s+('
 
@@ -21,13 +24,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'common.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'news.middleware.SnapshotMiddleware',
+    'news.routers.ReadYourWritesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'common.middleware.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'yanews.urls'
@@ -58,6 +65,30 @@ DATABASES = {
     }
 }
 
+# PRAGMA для каждого нового соединения с SQLite, например
+# {'journal_mode': 'WAL'}. Боевой набор — в yanews/settings_production.py.
+SQLITE_PRAGMAS = {}
+
+# Реплики только для чтения. Локально их изображают копии файла SQLite,
+# например: DATABASE_REPLICAS = [BASE_DIR / 'replica.sqlite3'].
+DATABASE_REPLICAS = []
+for index, replica in enumerate(DATABASE_REPLICAS, start=1):
+    DATABASES[f'replica_{index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': replica,
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['news.routers.PrimaryReplicaRouter']
+# Сколько секунд после записи клиент читает из основной базы.
+READ_YOUR_WRITES_SECONDS = 5
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yanews',
+    }
+}
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -80,3 +111,98 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+NEWS_COUNT_ON_ARCHIVE_PAGE = 20
+NEWS_COUNT_ON_SEARCH_PAGE = 20
+NEWS_TOTAL_CACHE_TIMEOUT = 300
+HOME_PAGE_CACHE_TIMEOUT = 300
+
+COMMENTS_COUNT_ON_DETAIL_PAGE = 50
+# Сколько последних комментариев показывать в админке новости.
+COMMENTS_COUNT_IN_ADMIN_INLINE = 20
+
+# Блок «Самые обсуждаемые»: вес комментария вдвое падает
+# за TRENDING_HALF_LIFE_HOURS, в блок попадают новости, чьё обсуждение
+# весит не меньше TRENDING_MIN_SCORE свежих комментариев.
+TRENDING_COUNT_ON_HOME_PAGE = 5
+TRENDING_HALF_LIFE_HOURS = 6
+TRENDING_MIN_SCORE = 0.5
+
+# Ветки новостей старше стольких дней команда archive_comments
+# переносит в архивную таблицу, чтобы рабочая оставалась небольшой.
+COMMENT_ARCHIVE_AFTER_DAYS = 180
+
+# Новые комментарии пишет один поток пачками: до BATCH_SIZE штук
+# или всё, что пришло за FLUSH_MS миллисекунд.
+COMMENT_INGEST_QUEUE = False
+COMMENT_INGEST_BATCH_SIZE = 100
+COMMENT_INGEST_FLUSH_MS = 5
+
+# Поток новых комментариев /news/<id>/events/ (news.events, только
+# под ASGI): очередь подписчика в событиях, после которой он
+# отключается как отставший, пустое событие раз в KEEPALIVE секунд
+# и сколько пропущенных комментариев досылать при переподключении.
+COMMENT_EVENTS_QUEUE_SIZE = 100
+COMMENT_EVENTS_KEEPALIVE = 15
+COMMENT_EVENTS_BACKLOG = 100
+
+# Файл со списком запрещённых слов, по одному на строке.
+# Если не задан, используется news.forms.BAD_WORDS.
+BAD_WORDS_FILE = None
+
+# Сколько SQL-запросов может сделать страница, по имени маршрута.
+# Считаем для залогиненного пользователя и пустого кеша. BEGIN
+# тоже запрос, хотя в тестах его не видно: они идут внутри транзакции.
+QUERY_BUDGETS = {
+    'news:home': 4,
+    'news:archive': 4,
+    'news:search': 4,
+    # У архивных новостей ветка читается из двух таблиц, а архивный
+    # комментарий ищется после промаха по рабочей таблице.
+    'news:detail': 8,
+    'news:edit': 8,
+    'news:delete': 10,
+    'news:export': 3,
+    'users:login': 9,
+    'users:logout': 4,
+    'users:signup': 4,
+}
+# 'raise' — исключение при превышении бюджета, 'log' — предупреждение.
+QUERY_BUDGET_ACTION = 'raise' if DEBUG else 'log'
+
+# Профилирование запросов (common.middleware.ProfilingMiddleware):
+# доля запросов, которые снимаются целиком, порог медленного запроса
+# в миллисекундах, инструмент ('cprofile' или 'tracemalloc')
+# и каталог для снимков. При заданном пороге снимаются все запросы,
+# а сохраняются только медленные.
+PROFILE_SAMPLE_RATE = 0
+PROFILE_SLOW_MS = None
+PROFILE_MODE = 'cprofile'
+PROFILE_DIR = BASE_DIR / 'profiles'
+
+# Строка JSON на каждый запрос от ProfilingMiddleware. Без этой
+# настройки записи уровня INFO отбрасываются.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'requests': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'common.middleware.requests': {
+            'handlers': ['requests'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Каталог готовых HTML-снимков главной и страниц новостей для гостей,
+# например BASE_DIR / 'snapshots'. Снимки пересобираются после коммита
+# правок новости или комментария; все сразу — командой
+# publish_snapshots (после выкладки шаблонов и раз в несколько минут,
+# чтобы обновлялся блок «Самые обсуждаемые»). None — снимков нет.
+SNAPSHOT_DIR = None
+
+# Сколько секунд common.auth.CachedAuthenticationMiddleware
+# помнит пользователя, не перечитывая его из базы.
+AUTH_USER_CACHE_TIMEOUT = 30
@@ -0,0 +1,35 @@
+"""
+Профиль для боевого запуска на SQLite.
+
+Включается переменной окружения:
+    DJANGO_SETTINGS_MODULE=yanews.settings_production
+"""
+from .settings import *  # noqa: F401, F403
+from .settings import DATABASES, MIDDLEWARE
+
+# Соединение живёт между запросами, а не открывается на каждый заново.
+DATABASES['default']['CONN_MAX_AGE'] = 60
+
+SQLITE_PRAGMAS = {
+    # Читатели не ждут писателя, писатель не ждёт читателей.
+    'journal_mode': 'WAL',
+    # В режиме WAL целостность сохраняется и без fsync на каждый коммит.
+    'synchronous': 'NORMAL',
+    # Сколько миллисекунд ждать чужую запись вместо «database is locked».
+    'busy_timeout': 5000,
+    # Читаем файл базы через отображение в память.
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+# Сессия целиком в подписанной cookie: к таблице сессий запросов нет.
+# Выход стирает cookie у клиента, но скопированная cookie действует
+# до конца SESSION_COOKIE_AGE.
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+
+# Пользователь берётся из памяти процесса, а не из базы на каждый запрос.
+MIDDLEWARE = [
+    'common.auth.CachedAuthenticationMiddleware'
+    if name == 'django.contrib.auth.middleware.AuthenticationMiddleware'
+    else name
+    for name in MIDDLEWARE
+]
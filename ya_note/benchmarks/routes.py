@@ -0,0 +1,220 @@
+"""
+Время, SQL-запросы и память каждого маршрута на данных разного размера.
+
+Для каждого размера генерирует базу командой generate_notes
+(десять пользователей, у каждого в среднем size / 10 заметок),
+прогоняет через тестовый клиент все маршруты notes/urls.py и входа
+от имени пользователя с наибольшим числом заметок, а результат
+пишет в JSON. Если задана базовая линия, сравнивает с ней
+и завершается с кодом 1, когда маршрут стал медленнее порога
+или делает больше запросов.
+
+Запуск из каталога ya_note:
+    python -m benchmarks.routes --sizes 1000 10000 --output routes.json
+    python -m benchmarks.routes --baseline routes.json --threshold 0.2
+"""
+import argparse
+import itertools
+import sys
+from io import StringIO
+
+from benchmarks.utils import (
+    find_regressions, measure, read_json, setup_django, use_database,
+    write_json
+)
+
+USERS = 10
+
+
+def request(client, method, url, data=None):
+    """Функция, которая делает запрос и проверяет, что он удался."""
+
+    def send():
+        response = getattr(client, method)(url, data)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{method.upper()} {url}: {response}')
+
+    return send
+
+
+def make_cases():
+    """Случаи по маршрутам: имя маршрута → {название: prepare}."""
+    from django.contrib.auth import get_user_model
+    from django.db.models import Count
+    from django.test import Client
+    from django.urls import reverse
+    from notes.management.commands.generate_notes import PASSWORD
+    from notes.models import Note
+
+    author = get_user_model().objects.annotate(
+        notes=Count('note')
+    ).order_by('-notes').first()
+    anonymous, author_client = Client(), Client()
+    author_client.force_login(author)
+    note = Note.objects.create(
+        title='Замер', text='Текст', slug='bench', author=author
+    )
+    counter = itertools.count()
+
+    def new_note():
+        return Note.objects.create(
+            title='Удалить', text='Текст',
+            slug=f'bench-delete-{next(counter)}', author=author,
+        )
+
+    def logged_out_client():
+        client = Client()
+        client.force_login(author)
+        return client
+
+    def note_data():
+        return {
+            'title': 'Новая', 'text': 'Текст',
+            'slug': f'bench-new-{next(counter)}',
+        }
+
+    return {
+        'notes:home': {
+            'GET': lambda: request(anonymous, 'get', reverse('notes:home')),
+        },
+        'notes:list': {
+            'GET': lambda: request(
+                author_client, 'get', reverse('notes:list')
+            ),
+        },
+        'notes:add': {
+            'GET': lambda: request(author_client, 'get', reverse('notes:add')),
+            'POST': lambda: request(
+                author_client, 'post', reverse('notes:add'), note_data()
+            ),
+        },
+        'notes:detail': {
+            'GET': lambda: request(
+                author_client, 'get',
+                reverse('notes:detail', args=(note.slug,)),
+            ),
+        },
+        'notes:edit': {
+            'GET': lambda: request(
+                author_client, 'get', reverse('notes:edit', args=(note.slug,))
+            ),
+            'POST': lambda: request(
+                author_client, 'post',
+                reverse('notes:edit', args=(note.slug,)),
+                {'title': 'Правка', 'text': 'Текст', 'slug': note.slug},
+            ),
+        },
+        'notes:delete': {
+            'GET': lambda: request(
+                author_client, 'get',
+                reverse('notes:delete', args=(note.slug,)),
+            ),
+            'POST': lambda: request(
+                author_client, 'post',
+                reverse('notes:delete', args=(new_note().slug,)),
+            ),
+        },
+        'notes:success': {
+            'GET': lambda: request(
+                author_client, 'get', reverse('notes:success')
+            ),
+        },
+        'users:login': {
+            'GET': lambda: request(anonymous, 'get', reverse('users:login')),
+            'POST': lambda: request(
+                Client(), 'post', reverse('users:login'),
+                {'username': author.username, 'password': PASSWORD},
+            ),
+        },
+        'users:logout': {
+            'GET': lambda: request(
+                logged_out_client(), 'get', reverse('users:logout')
+            ),
+        },
+        'users:signup': {
+            'GET': lambda: request(anonymous, 'get', reverse('users:signup')),
+            'POST': lambda: request(
+                Client(), 'post', reverse('users:signup'),
+                {
+                    'username': f'newcomer{next(counter)}',
+                    'password1': PASSWORD,
+                    'password2': PASSWORD,
+                },
+            ),
+        },
+    }
+
+
+def route_names():
+    from notes.urls import urlpatterns
+    from yanote.urls import auth_urls
+
+    return [f'notes:{pattern.name}' for pattern in urlpatterns] + [
+        f'users:{pattern.name}' for pattern in auth_urls[0]
+    ]
+
+
+def run_size(size, repeat):
+    from django.core.management import call_command
+
+    use_database()
+    call_command(
+        'generate_notes',
+        users=USERS,
+        notes_per_user=max(1, size // USERS),
+        stdout=StringIO(),
+    )
+    cases = make_cases()
+    missing = set(route_names()) - set(cases)
+    if missing:
+        raise SystemExit(f'Нет замеров для маршрутов: {sorted(missing)}')
+    results = {}
+    for route, variants in cases.items():
+        for variant, prepare in variants.items():
+            name = f'{route} {variant}'
+            results[name] = measure(prepare, repeat)
+            print(
+                f'{size:>8} {name:<22} '
+                f'p50 {results[name]["p50"]:8.2f} мс '
+                f'p99 {results[name]["p99"]:8.2f} мс '
+                f'{results[name]["queries"]:3} запросов '
+                f'{results[name]["peak_kib"]:9.1f} КиБ'
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[1000, 10000]
+    )
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--output', help='Куда записать результаты.')
+    parser.add_argument('--baseline', help='Результаты для сравнения.')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.2,
+        help='Допустимый рост медианы, доля от базовой линии.',
+    )
+    args = parser.parse_args()
+
+    setup_django(ALLOWED_HOSTS=['testserver'], QUERY_BUDGET_ACTION='log')
+    results = {
+        str(size): run_size(size, args.repeat) for size in args.sizes
+    }
+    if args.output:
+        write_json(args.output, results)
+    if args.baseline:
+        regressions = list(find_regressions(
+            results, read_json(args.baseline), args.threshold
+        ))
+        for regression in regressions:
+            print(f'Регрессия: {regression}')
+        if regressions:
+            sys.exit(1)
+        print('Регрессий нет.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+SQL-запросы на страницу с сессиями в базе и в подписанной cookie.
+
+Сравнивает настройки по умолчанию (сессии в таблице, пользователь
+из базы на каждый запрос) с yanote.settings_production (сессия
+в cookie, пользователь из кеша процесса) на страницах заметок.
+
+Запуск из каталога ya_note:
+    python -m benchmarks.sessions
+"""
+import argparse
+import time
+
+from benchmarks.utils import setup_django
+
+PASSWORD = 'load-test'
+
+
+def count_queries(client, url, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    client.get(url)
+    queries, elapsed = 0, 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as captured:
+            client.get(url)
+        elapsed += time.perf_counter() - started
+        queries += len(captured)
+    return queries / repeat, elapsed / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django(ALLOWED_HOSTS=['testserver'], QUERY_BUDGET_ACTION='log')
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from django.urls import reverse
+    from notes.models import Note
+    from yanote import settings_production
+
+    user = get_user_model().objects.create_user(
+        username='bench', password=PASSWORD
+    )
+    note = Note.objects.create(
+        title='Заметка', text='Текст', slug='bench', author=user
+    )
+    urls = {
+        'home': reverse('notes:home'),
+        'list': reverse('notes:list'),
+        'detail': reverse('notes:detail', args=(note.slug,)),
+    }
+    profiles = (
+        ('default', settings.SESSION_ENGINE, settings.MIDDLEWARE),
+        (
+            'production',
+            settings_production.SESSION_ENGINE,
+            settings_production.MIDDLEWARE,
+        ),
+    )
+    for profile, engine, middleware in profiles:
+        settings.SESSION_ENGINE = engine
+        settings.MIDDLEWARE = middleware
+        # Клиент собирает цепочку middleware при создании.
+        client = Client()
+        client.login(username='bench', password=PASSWORD)
+        for name, url in urls.items():
+            queries, latency = count_queries(client, url, args.repeat)
+            print(
+                f'{profile:>10} {name:>8}: '
+                f'{queries:4.1f} запросов, {latency:6.2f} мс'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,30 @@
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+
+from common.admin import BatchDeleteUserAdmin
 
 from .models import Note
+from .moderation import delete_users
+
+User = get_user_model()
+
+
+@admin.register(Note)
+class NoteAdmin(admin.ModelAdmin):
+    list_display = ('title', 'slug', 'author')
+    list_select_related = ('author',)
+    # Вместо списка всех пользователей в каждой форме — поле для id.
+    raw_id_fields = ('author',)
+    search_fields = ('=slug', '=author__username')
+    show_full_result_count = False
+
+
+admin.site.unregister(User)
+
 
-admin.site.register(Note)
+@admin.register(User)
+class NoteAuthorAdmin(BatchDeleteUserAdmin):
+    """Пользователи удаляются вместе с заметками пачками."""
+    related_model = Note
+    count_label = 'заметок'
+    delete_users = staticmethod(delete_users)
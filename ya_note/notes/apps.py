@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class NotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notes'
+
+    def ready(self):
+        from common.sqlite import apply_pragmas
+
+        connection_created.connect(
+            apply_pragmas, dispatch_uid='common.sqlite.apply_pragmas'
+        )
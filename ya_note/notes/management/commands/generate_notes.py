@@ -0,0 +1,131 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from notes.models import Note
+
+BATCH_SIZE = 10000
+# Пароль всех сгенерированных пользователей, чтобы под ними входить.
+PASSWORD = 'load-test'
+WORDS = (
+    'купить', 'позвонить', 'встреча', 'проект', 'отчёт', 'список',
+    'идея', 'книга', 'фильм', 'рецепт', 'покупки', 'дом', 'работа',
+    'отпуск', 'билеты', 'врач', 'спорт', 'план', 'неделя', 'подарок',
+    'учёба', 'курс', 'задача', 'письмо', 'счёт', 'ремонт', 'машина',
+)
+# Тексты берутся из заранее собранного набора: собирать каждый
+# из слов заново дольше, чем вставлять строку.
+TEXT_POOL_SIZE = 10000
+User = get_user_model()
+
+
+def make_text(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words)).capitalize()
+
+
+def make_pool(rng, min_words, max_words):
+    return [
+        make_text(rng, rng.randint(min_words, max_words))
+        for _ in range(TEXT_POOL_SIZE)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует пользователей и их заметки для нагрузочного '
+        'тестирования. Одинаковый --seed даёт одинаковые данные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument(
+            '--notes-per-user',
+            type=int,
+            default=100,
+            help='Сколько заметок в среднем у пользователя.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix',
+            default='load',
+            help='Начало имён пользователей и адресов заметок.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько строк вставлять в одной транзакции.',
+        )
+
+    def handle(self, *args, users, notes_per_user, seed, prefix,
+               batch_size, **options):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.started = time.monotonic()
+        user_ids = self.generate_users(users, prefix)
+        self.generate_notes(user_ids, notes_per_user, prefix)
+        self.log('Готово')
+
+    def log(self, message):
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(f'[{elapsed:7.1f} с] {message}')
+
+    def generate_users(self, count, prefix):
+        password = make_password(PASSWORD)
+        User.objects.bulk_create(
+            (
+                User(username=f'{prefix}{index}', password=password)
+                for index in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        user_ids = list(
+            User.objects.filter(
+                username__startswith=prefix
+            ).order_by('pk').values_list('pk', flat=True)
+        )
+        self.log(f'Пользователей: {count}')
+        return user_ids
+
+    def iter_notes(self, user_ids, notes_per_user, prefix):
+        """
+        Заметки пользователей; число у каждого случайно от 0
+        до удвоенного среднего. Адрес уникален: в нём номер
+        пользователя и номер заметки.
+        """
+        rng = self.rng
+        titles = [title[:100] for title in make_pool(rng, 1, 6)]
+        texts = make_pool(rng, 5, 80)
+        for user_id in user_ids:
+            for number in range(rng.randint(0, 2 * notes_per_user)):
+                yield (
+                    rng.choice(titles),
+                    rng.choice(texts),
+                    f'{prefix}-{user_id}-{number}',
+                    user_id,
+                )
+
+    def generate_notes(self, user_ids, notes_per_user, prefix):
+        sql = (
+            f'INSERT INTO {Note._meta.db_table} '
+            '(title, text, slug, author_id) VALUES (%s, %s, %s, %s)'
+        )
+        batch = []
+        inserted = 0
+        for row in self.iter_notes(user_ids, notes_per_user, prefix):
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                inserted += self.flush(sql, batch)
+                batch = []
+        inserted += self.flush(sql, batch)
+        self.log(f'Заметок: {inserted}')
+
+    def flush(self, sql, batch):
+        if batch:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, batch)
+        return len(batch)
@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from notes.models import DELETE_BATCH_SIZE
+from notes.moderation import delete_users
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет пользователей вместе с заметками: заметки — '
+        'пачками в коротких транзакциях.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='+')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DELETE_BATCH_SIZE,
+            help='Сколько заметок удалять в одной транзакции.',
+        )
+
+    def handle(self, *args, usernames, batch_size, **options):
+        deleted = delete_users(
+            get_user_model().objects.filter(username__in=usernames),
+            batch_size,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено пользователей: {deleted}')
+        )
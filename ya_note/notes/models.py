@@ -3,6 +3,22 @@ from django.db import models
 
 from pytils.translit import slugify
 
+from common.deletion import delete_in_batches
+
+# Сколько заметок удалять в одной транзакции.
+DELETE_BATCH_SIZE = 1000
+
+
+class NoteQuerySet(models.QuerySet):
+
+    def delete_in_batches(self, batch_size=DELETE_BATCH_SIZE):
+        """
+        Удаляет заметки пачками в коротких транзакциях.
+
+        Возвращает число удалённых.
+        """
+        return delete_in_batches(self, batch_size)[0]
+
 
 class Note(models.Model):
     title = models.CharField(
@@ -26,8 +42,21 @@ class Note(models.Model):
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        # Поиск по автору покрывает составной индекс ниже.
+        db_index=False,
     )
 
+    objects = NoteQuerySet.as_manager()
+
+    class Meta:
+        indexes = (
+            # Заметки доступны только автору: список и поиск по slug
+            # всегда фильтруются по author.
+            models.Index(
+                fields=('author', 'slug'), name='note_author_slug_idx'
+            ),
+        )
+
     def __str__(self):
         return self.title
 
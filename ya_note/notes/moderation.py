@@ -0,0 +1,15 @@
+from django.contrib.auth import get_user_model
+
+from .models import DELETE_BATCH_SIZE, Note
+
+
+def delete_users(queryset, batch_size=DELETE_BATCH_SIZE):
+    """
+    Удаляет пользователей, а их заметки — пачками в коротких транзакциях.
+
+    Возвращает число удалённых пользователей.
+    """
+    user_ids = list(queryset.values_list('pk', flat=True))
+    Note.objects.filter(author_id__in=user_ids).delete_in_batches(batch_size)
+    get_user_model().objects.filter(pk__in=user_ids).delete()
+    return len(user_ids)
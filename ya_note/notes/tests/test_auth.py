@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.tests.common import BaseSetUp
+from yanote import settings_production
+
+User = get_user_model()
+
+PASSWORD = 'Пароль123'
+
+
+@override_settings(
+    SESSION_ENGINE=settings_production.SESSION_ENGINE,
+    MIDDLEWARE=settings_production.MIDDLEWARE,
+)
+class TestCachedAuthentication(BaseSetUp):
+
+    def setUp(self):
+        self.reader = User.objects.create_user(
+            username='reader', password=PASSWORD
+        )
+        self.client = Client()
+        self.client.login(username='reader', password=PASSWORD)
+        self.url = reverse('notes:list')
+
+    def test_user_is_read_from_process_cache(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['user'], self.reader)
+        self.assertEqual(len(queries), 1)
+
+    def test_password_change_ends_cached_sessions(self):
+        self.client.get(self.url)
+        self.reader.set_password('Новый пароль')
+        self.reader.save()
+        response = self.client.get(self.url)
+        self.assertRedirects(
+            response, f'{reverse("users:login")}?next={self.url}'
+        )
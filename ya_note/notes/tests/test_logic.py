@@ -1,6 +1,9 @@
 from http import HTTPStatus
+from io import StringIO
 
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
 from django.urls import reverse
 
 from notes.models import Note
@@ -117,3 +120,66 @@ class ChangeNote(BaseSetUp):
         self.assertEqual(self.note.title, note_from_db.title)
         self.assertEqual(self.note.text, note_from_db.text)
         self.assertEqual(self.note.slug, note_from_db.slug)
+
+
+class TestGenerateNotes(TestCase):
+
+    def generate(self, seed, prefix):
+        call_command(
+            'generate_notes', users=3, notes_per_user=4, seed=seed,
+            prefix=prefix, stdout=StringIO(),
+        )
+        return list(
+            Note.objects.filter(slug__startswith=f'{prefix}-').order_by(
+                'pk'
+            ).values_list('title', 'text')
+        )
+
+    def test_generated_notes_depend_only_on_seed(self):
+        first = self.generate(seed=7, prefix='one')
+        self.assertTrue(first)
+        self.assertEqual(
+            User.objects.filter(username__startswith='one').count(), 3
+        )
+        self.assertEqual(self.generate(seed=7, prefix='two'), first)
+
+
+class TestPurgeUsers(BaseSetUp):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Note.objects.bulk_create(
+            Note(
+                title='Заметка', text='Текст', slug=f'purge-{index}',
+                author=cls.author,
+            )
+            for index in range(10)
+        )
+        cls.admin = User.objects.create_superuser(username='admin')
+
+    def test_notes_are_deleted_in_batches(self):
+        deleted = Note.objects.filter(
+            author=self.author
+        ).delete_in_batches(batch_size=3)
+        self.assertEqual(deleted, 11)
+        self.assertFalse(Note.objects.exists())
+
+    def test_admin_deletes_user_with_notes(self):
+        client = self.client
+        client.force_login(self.admin)
+        url = reverse('admin:auth_user_delete', args=(self.author.pk,))
+        self.assertContains(client.get(url), 'заметок: 11')
+        client.post(url, {'post': 'yes'})
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertFalse(Note.objects.exists())
+
+    def test_purge_users_command(self):
+        call_command(
+            'purge_users', self.author.username, self.not_author.username,
+            stdout=StringIO(),
+        )
+        self.assertEqual(
+            list(User.objects.values_list('username', flat=True)), ['admin']
+        )
+        self.assertFalse(Note.objects.exists())
@@ -0,0 +1,42 @@
+import json
+import logging
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import override_settings
+from django.urls import reverse
+
+from notes.tests.common import BaseSetUp
+
+
+class TestProfiling(BaseSetUp):
+
+    def test_server_timing_splits_request_time(self):
+        response = self.author_client.get(reverse('notes:list'))
+        parts = [
+            part.strip().split(';')[0]
+            for part in response['Server-Timing'].split(',')
+        ]
+        self.assertEqual(parts, ['db', 'tpl', 'app', 'total'])
+
+    def test_request_is_logged_as_json(self):
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        logger = logging.getLogger('common.middleware.requests')
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        self.author_client.get(reverse('notes:list'))
+        record, = records
+        self.assertEqual(
+            json.loads(record.getMessage())['view'], 'notes:list'
+        )
+
+    def test_sampled_request_is_saved(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        with override_settings(PROFILE_SAMPLE_RATE=1, PROFILE_DIR=directory):
+            self.author_client.get(reverse('notes:list'))
+        saved, = directory.iterdir()
+        self.assertTrue(saved.name.endswith('.prof'))
@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from common.middleware import QueryBudgetExceeded
+from notes.tests.common import BaseSetUp
+from notes.urls import urlpatterns
+from yanote.urls import auth_urls
+
+User = get_user_model()
+
+LOGIN_DATA = {'username': 'Test_reader', 'password': 'Пароль_123456'}
+
+
+class TestQueryBudgets(BaseSetUp):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        User.objects.create_user(**LOGIN_DATA)
+
+    def get_cases(self):
+        slug = self.note.slug
+        note_data = {'title': 'Новая', 'text': 'Текст', 'slug': 'new'}
+        return {
+            'notes:home': (('get', reverse('notes:home'), None),),
+            'notes:list': (('get', reverse('notes:list'), None),),
+            'notes:add': (
+                ('get', reverse('notes:add'), None),
+                ('post', reverse('notes:add'), note_data),
+            ),
+            'notes:detail': (
+                ('get', reverse('notes:detail', args=(slug,)), None),
+            ),
+            'notes:edit': (
+                ('get', reverse('notes:edit', args=(slug,)), None),
+                ('post', reverse('notes:edit', args=(slug,)),
+                 {'title': 'Правка', 'text': 'Текст', 'slug': slug}),
+            ),
+            'notes:delete': (
+                ('get', reverse('notes:delete', args=(slug,)), None),
+                ('post', reverse('notes:delete', args=(slug,)), None),
+            ),
+            'notes:success': (('get', reverse('notes:success'), None),),
+            'users:login': (('post', reverse('users:login'), LOGIN_DATA),),
+            'users:logout': (('get', reverse('users:logout'), None),),
+            'users:signup': (
+                ('post', reverse('users:signup'), {
+                    'username': 'Новичок',
+                    'password1': 'Пароль_123456',
+                    'password2': 'Пароль_123456',
+                }),
+            ),
+        }
+
+    def test_every_route_has_budget(self):
+        names = {f'notes:{pattern.name}' for pattern in urlpatterns} | {
+            f'users:{pattern.name}' for pattern in auth_urls[0]
+        }
+        self.assertEqual(names, set(settings.QUERY_BUDGETS))
+
+    def test_routes_fit_query_budgets(self):
+        for name, requests in self.get_cases().items():
+            budget = settings.QUERY_BUDGETS[name]
+            for method, url, data in requests:
+                client = Client() if name.startswith('users:') else (
+                    self.author_client
+                )
+                with self.subTest(name=name, method=method):
+                    with CaptureQueriesContext(connection) as context:
+                        getattr(client, method)(url, data)
+                    self.assertLessEqual(len(context), budget)
+
+    @override_settings(
+        QUERY_BUDGETS={'notes:list': 1}, QUERY_BUDGET_ACTION='raise'
+    )
+    def test_middleware_raises_over_budget(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.author_client.get(reverse('notes:list'))
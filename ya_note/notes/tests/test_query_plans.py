@@ -0,0 +1,38 @@
+import re
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.tests.common import BaseSetUp
+
+# Полный проход по таблице без индекса или сортировка во временном дереве.
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?\w+$|TEMP B-TREE')
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+class TestQueryPlans(BaseSetUp):
+
+    def test_views_use_indexes(self):
+        urls = (
+            ('notes:list', None),
+            ('notes:detail', (self.note.slug,)),
+            ('notes:edit', (self.note.slug,)),
+            ('notes:delete', (self.note.slug,)),
+        )
+        for name, args in urls:
+            with self.subTest(name=name):
+                with CaptureQueriesContext(connection) as context:
+                    self.author_client.get(reverse(name, args=args))
+                for query in context.captured_queries:
+                    if not query['sql'].startswith('SELECT'):
+                        continue
+                    for step in explain(query['sql']):
+                        self.assertIsNone(
+                            FULL_SCAN.search(step), (query['sql'], step)
+                        )
@@ -0,0 +1,17 @@
+from django.db import connections
+from django.test import TestCase, override_settings
+
+
+class TestSqlitePragmas(TestCase):
+
+    @override_settings(
+        SQLITE_PRAGMAS={'busy_timeout': 1234, 'synchronous': 'NORMAL'}
+    )
+    def test_new_connection_gets_pragmas(self):
+        connection = connections.create_connection('default')
+        self.addCleanup(connection.close)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone(), (1234,))
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone(), (1,))
@@ -32,9 +32,8 @@ class NoteCreate(NoteBase, generic.CreateView):
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        """Автор проставляется до сохранения, заметка пишется один раз."""
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
@@ -1,8 +1,11 @@
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Общий для ya_news и ya_note пакет common лежит в корне репозитория.
+sys.path.append(str(BASE_DIR.parent))
 
 SECRET_KEY = 'django-insecure-yipnj$#j!ajarq%k55z4kuf3x79)91h0h42o9!1ho(z=!%mt=#'
 
@@ -22,6 +25,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'common.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -29,6 +33,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'common.middleware.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'yanote.urls'
@@ -59,6 +64,10 @@ DATABASES = {
     }
 }
 
+# PRAGMA для каждого нового соединения с SQLite, например
+# {'journal_mode': 'WAL'}. Боевой набор — в yanote/settings_production.py.
+SQLITE_PRAGMAS = {}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -87,3 +96,51 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+# Сколько SQL-запросов может сделать страница, по имени маршрута.
+# Считаем для залогиненного пользователя.
+QUERY_BUDGETS = {
+    'notes:home': 2,
+    'notes:list': 3,
+    'notes:add': 5,
+    'notes:detail': 3,
+    'notes:edit': 6,
+    'notes:delete': 4,
+    'notes:success': 2,
+    'users:login': 9,
+    'users:logout': 4,
+    'users:signup': 4,
+}
+# 'raise' — исключение при превышении бюджета, 'log' — предупреждение.
+QUERY_BUDGET_ACTION = 'raise' if DEBUG else 'log'
+
+# Профилирование запросов (common.middleware.ProfilingMiddleware):
+# доля запросов, которые снимаются целиком, порог медленного запроса
+# в миллисекундах, инструмент ('cprofile' или 'tracemalloc')
+# и каталог для снимков. При заданном пороге снимаются все запросы,
+# а сохраняются только медленные.
+PROFILE_SAMPLE_RATE = 0
+PROFILE_SLOW_MS = None
+PROFILE_MODE = 'cprofile'
+PROFILE_DIR = BASE_DIR / 'profiles'
+
+# Строка JSON на каждый запрос от ProfilingMiddleware. Без этой
+# настройки записи уровня INFO отбрасываются.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'requests': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'common.middleware.requests': {
+            'handlers': ['requests'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Сколько секунд common.auth.CachedAuthenticationMiddleware
+# помнит пользователя, не перечитывая его из базы.
+AUTH_USER_CACHE_TIMEOUT = 30